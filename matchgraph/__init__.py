@@ -0,0 +1,12 @@
+"""
+MatchGraph: a matching game played on the vertices of a graph. Swap two
+neighbouring vertices to make a connected group of 3 or more of one colour,
+which is then removed, its neighbours being joined together.
+
+Importing the package only loads the game logic. pygame is only needed to
+draw the game, which is started with python -m matchgraph.
+"""
+
+from .graph import Graph
+from .colorgraph import ColorGraph, ColorGraphObserver
+from .vector import Vector
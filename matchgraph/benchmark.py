@@ -0,0 +1,435 @@
+"""
+benchmark.py
+
+Times the core operations of the matching game on synthetic boards from
+boards.py, and stores the results as JSON lines so that runs on different
+commits can be compared.
+
+Usage:
+    python -m matchgraph.benchmark --sizes 10,100,1000 --output results.jsonl
+    python -m matchgraph.benchmark --compare old.jsonl new.jsonl
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+
+from copy import deepcopy
+from itertools import islice
+from .boards import TOPOLOGIES, make_board, playable_board
+from .layout import RELAX_RADIUS, Layout, undirected_adjacency
+from .parallel import ParallelForces
+
+# Boards with a quadratic number of edges become impractical well before
+# the other topologies do, so they are skipped above this size.
+DENSE_LIMIT = 2000
+
+# Number of operations timed by the benchmarks that sample the board.
+SAMPLE_SIZE = 100
+
+# The force layout takes quadratic time per step, so it is only timed on
+# boards up to this size.
+LAYOUT_LIMIT = 2000
+
+# Relaxing around an edge moves every vertex near it, which near a hub of a
+# scale free board, or anywhere on a dense one, is most of the board. Edges
+# are sampled for it only until their regions hold this many vertices.
+RELAX_LIMIT = 2000
+
+# A swap's cascade joins the neighbours of every group it removes into a
+# clique, which takes quadratic time and already takes seconds at this size,
+# so swaps are only timed on boards up to this size.
+SWAP_LIMIT = 1000
+
+def sample_edges(board, count = SAMPLE_SIZE):
+    """
+    Returns up to count edges of the board joining vertices of
+    different colours, which are the only edges worth swapping.
+    """
+
+    edges = []
+
+    for vertex_from, vertex_to in board.graph.edges():
+        if board.get_color(vertex_from) != board.get_color(vertex_to):
+            edges.append((vertex_from, vertex_to))
+
+            if len(edges) == count:
+                break
+
+    return edges
+
+def bench_graph_mutations(board):
+    """
+    Removes and re-adds a sample of edges, then adds and removes a batch
+    of new vertices, on a copy of the underlying Graph.
+    """
+
+    graph = deepcopy(board.graph)
+    edges = graph.edges()[:SAMPLE_SIZE]
+    new_vertices = [("new", i) for i in range(SAMPLE_SIZE)]
+
+    def run():
+        for vertex_from, vertex_to in edges:
+            graph.remove_edge(vertex_from, vertex_to)
+            graph.add_edge(vertex_from, vertex_to)
+
+        for vertex in new_vertices:
+            graph.add_vertex(vertex)
+
+        for vertex in new_vertices:
+            graph.remove_vertex(vertex)
+
+    return run, 2*len(edges) + 2*len(new_vertices)
+
+def bench_partition_graph(board):
+    """
+    Partitions the whole board into same coloured components, emptying the
+    board's cache first so that the partition is worked out every time.
+    """
+
+    def run():
+        board.clear_cache()
+        board.partition_graph()
+
+    return run, 1
+
+def bench_partition_graph_cached(board):
+    """ Looks up the partition of a board which has already been cached. """
+
+    board.partition_graph()
+
+    return board.partition_graph, 1
+
+def bench_can_swap(board):
+    """ Checks whether a sample of edges can be swapped. """
+
+    edges = sample_edges(board)
+
+    def run():
+        for vertex_1, vertex_2 in edges:
+            board.can_swap(vertex_1, vertex_2)
+
+    return run, len(edges)
+
+def bench_swap_vertices(board):
+    """
+    Plays a single swap on a copy of the board, including every cascade
+    of deletions it sets off.
+    """
+
+    if len(board.vertex_colors) > SWAP_LIMIT:
+        return None
+
+    edges = list(islice(board.legal_moves(), 1)) or sample_edges(board, 1)
+
+    if not edges:
+        return None
+
+    copied = deepcopy(board)
+    vertex_1, vertex_2 = edges[0]
+
+    def run():
+        copied.swap_vertices(vertex_1, vertex_2)
+
+    return run, 1
+
+def bench_layout_step(board):
+    """ Moves every vertex of the board by one step of the force layout. """
+
+    if len(board.vertex_colors) > LAYOUT_LIMIT:
+        return None
+
+    layout = Layout(1200, 1000)
+    layout.place_new_vertices(board)
+
+    def run():
+        layout.gravitate_nodes(board, 1)
+
+    return run, 1
+
+def bench_multilevel_placement(board):
+    """ Places every vertex of the board with the multilevel layout. """
+
+    layout = Layout(1200, 1000, "multilevel")
+
+    def run():
+        layout.place_multilevel(board, seed = 0)
+
+    return run, 1
+
+def bench_local_relaxation(board):
+    """
+    Relaxes the layout around a sample of edges, as is done after each
+    move, with the rest of the board held in place.
+    """
+
+    edges = []
+    moved = 0
+
+    for edge in sample_edges(board):
+        if moved >= RELAX_LIMIT:
+            break
+
+        edges.append(edge)
+        moved += len(board.graph.neighbourhood(edge, RELAX_RADIUS, True))
+
+    if not edges:
+        return None
+
+    layout = Layout(1200, 1000, "multilevel")
+    layout.place_multilevel(board, seed = 0)
+
+    def run():
+        for edge in edges:
+            layout.relax_around(board, edge)
+
+    return run, len(edges)
+
+def bench_parallel_force_passes(board):
+    """
+    Starts a pool with a worker for each CPU and makes five force passes over
+    the whole board with it, from a square grid of starting positions.
+    """
+
+    adjacency = undirected_adjacency(board.graph.adjacency_dict)
+
+    if not adjacency:
+        return None
+
+    side = int(len(adjacency)**0.5) + 1
+    x = {vertex: i % side for i, vertex in enumerate(adjacency)}
+    y = {vertex: i//side for i, vertex in enumerate(adjacency)}
+
+    def run():
+        with ParallelForces(adjacency, x, y) as forces:
+            for i in range(5):
+                forces.step(1, 0.5)
+
+    return run, 5
+
+def bench_render_frame(board):
+    """
+    Draws one frame of the board off screen. Skipped if pygame is not
+    installed.
+    """
+
+    try:
+        from .render import Renderer
+        renderer = Renderer(1200, 1000, headless = True)
+    except ImportError:
+        return None
+
+    layout = Layout(1200, 1000)
+    layout.place_new_vertices(board)
+
+    # Zoomed out far enough to see most of the board.
+    renderer.zoom(1/32)
+    renderer.offset = layout.screen_center
+
+    def run():
+        renderer.update_screen_image(board, layout)
+
+    return run, 1
+
+# Benchmarks which change the board they are given need a fresh setup
+# for every repetition.
+BENCHMARKS = {
+    "graph_mutations": (bench_graph_mutations, False),
+    "partition_graph": (bench_partition_graph, False),
+    "partition_graph_cached": (bench_partition_graph_cached, False),
+    "can_swap": (bench_can_swap, False),
+    "swap_vertices": (bench_swap_vertices, True),
+    "layout_step": (bench_layout_step, False),
+    "multilevel_placement": (bench_multilevel_placement, False),
+    "local_relaxation": (bench_local_relaxation, False),
+    "parallel_force_passes": (bench_parallel_force_passes, False),
+    "render_frame": (bench_render_frame, False),
+}
+
+def time_benchmark(setup, board, repeat):
+    """
+    Runs a benchmark repeat times, returning the timings in seconds and the
+    number of operations each run performs. Time spent in setup is not
+    counted. Returns None if the benchmark does not apply to the board.
+    """
+
+    bench, fresh_setup = setup
+    prepared = bench(board)
+
+    if prepared is None:
+        return None
+
+    timings = []
+
+    for i in range(repeat):
+        if fresh_setup and i > 0:
+            prepared = bench(board)
+
+        run, operations = prepared
+
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+
+    return timings, operations
+
+def current_commit():
+    """ Returns the short hash of the checked out commit, if there is one. """
+
+    try:
+        output = subprocess.run(["git", "rev-parse", "--short", "HEAD"],
+                                capture_output = True, text = True)
+    except OSError:
+        return None
+
+    return output.stdout.strip() or None
+
+def run_benchmarks(sizes, topologies, color_counts, benchmarks,
+                   repeat = 3, seed = 0, playable = False):
+    """
+    Runs every requested benchmark on every board, yielding one result
+    dictionary per benchmark and board. Playable boards start without any
+    group of 3, like a real game, and boards which cannot be coloured that
+    way are skipped.
+    """
+
+    commit = current_commit()
+
+    for topology in topologies:
+        for size in sizes:
+            if topology == "near_complete" and size > DENSE_LIMIT:
+                continue
+
+            for color_count in color_counts:
+                if not playable:
+                    board = make_board(topology, size, color_count, seed)
+                else:
+                    try:
+                        board = playable_board(topology, size, color_count,
+                                               seed = seed)
+                    except ValueError:
+                        continue
+
+                edge_count = len(board.graph.edges())
+
+                for name in benchmarks:
+                    timed = time_benchmark(BENCHMARKS[name], board, repeat)
+
+                    if timed is None:
+                        continue
+
+                    timings, operations = timed
+
+                    yield {
+                        "benchmark": name,
+                        "topology": topology,
+                        "vertices": size,
+                        "edges": edge_count,
+                        "colors": color_count,
+                        "seed": seed,
+                        "playable": playable,
+                        "operations": operations,
+                        "repeat": repeat,
+                        "best": min(timings),
+                        "mean": sum(timings)/len(timings),
+                        "commit": commit,
+                        "python": platform.python_version(),
+                        "time": time.time(),
+                    }
+
+def result_key(result):
+    return (result["benchmark"], result["topology"], result["vertices"],
+            result["colors"], result.get("playable", False))
+
+def load_results(path):
+    """ Reads a file of JSON line results, keeping the last of any repeats. """
+
+    with open(path) as results_file:
+        results = [json.loads(line) for line in results_file if line.strip()]
+
+    return {result_key(result): result for result in results}
+
+def compare_results(old_path, new_path, threshold = 1.1):
+    """
+    Prints how the best timings in new_path compare to those in old_path,
+    flagging anything slower by more than the threshold ratio. Returns the
+    number of regressions found.
+    """
+
+    old = load_results(old_path)
+    new = load_results(new_path)
+
+    regressions = 0
+
+    for key in sorted(set(old) & set(new), key = str):
+        ratio = new[key]["best"]/max(old[key]["best"], 1e-12)
+        flag = ""
+
+        if ratio > threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+
+        print("{:<16} {:<14} {:>8} {:>3} {:<5}  {:>10.6f}s -> {:>10.6f}s  x{:.2f}{}"
+              .format(*key[:4], "play" if key[4] else "", old[key]["best"], new[key]["best"], ratio, flag))
+
+    return regressions
+
+def parse_list(text, convert = str):
+    return [convert(item) for item in text.split(",") if item]
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description = __doc__.split("\n\n")[1],
+        formatter_class = argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default = "10,100,1000,10000",
+                        help = "comma separated vertex counts")
+    parser.add_argument("--topologies", default = ",".join(TOPOLOGIES),
+                        help = "comma separated board topologies")
+    parser.add_argument("--colors", default = "4",
+                        help = "comma separated colour counts")
+    parser.add_argument("--benchmarks", default = ",".join(BENCHMARKS),
+                        help = "comma separated benchmarks to run")
+    parser.add_argument("--playable", action = "store_true",
+                        help = "use boards without any group of 3")
+    parser.add_argument("--repeat", type = int, default = 3)
+    parser.add_argument("--seed", type = int, default = 0)
+    parser.add_argument("--output", help = "file to append JSON results to")
+    parser.add_argument("--compare", nargs = 2, metavar = ("OLD", "NEW"),
+                        help = "compare two result files instead of running")
+    parser.add_argument("--threshold", type = float, default = 1.1,
+                        help = "slowdown ratio reported as a regression")
+
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        return 1 if compare_results(*args.compare, args.threshold) else 0
+
+    topologies = parse_list(args.topologies)
+    benchmarks = parse_list(args.benchmarks)
+
+    for name in topologies:
+        if name not in TOPOLOGIES:
+            parser.error("unknown topology {}".format(name))
+
+    for name in benchmarks:
+        if name not in BENCHMARKS:
+            parser.error("unknown benchmark {}".format(name))
+
+    output = open(args.output, "a") if args.output else sys.stdout
+
+    try:
+        for result in run_benchmarks(parse_list(args.sizes, int), topologies,
+                                     parse_list(args.colors, int), benchmarks,
+                                     args.repeat, args.seed, args.playable):
+            output.write(json.dumps(result) + "\n")
+            output.flush()
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,361 @@
+"""
+boards.py
+
+Generates reproducible synthetic boards for the matching game, so that
+benchmarks and experiments do not depend on hand written boards. Every
+generator takes a seed, so the same arguments always produce the same board.
+Edges are generated in both directions, as the game treats edges as
+undirected.
+"""
+
+import heapq
+import random
+
+from math import ceil, sqrt
+from .colorgraph import ColorGraph
+
+# Colours the game knows how to draw, in the order they are handed out.
+BOARD_COLORS = ["RED", "GREEN", "BLUE", "PURPLE", "YELLOW"]
+
+def board_colors(color_count):
+    """
+    Returns a list of color_count colour names. The drawable colours are used
+    first, and numbered colours are made up once they run out.
+
+    >>> board_colors(3)
+    ['RED', 'GREEN', 'BLUE']
+    >>> board_colors(7)[5:]
+    ['COLOR_5', 'COLOR_6']
+    """
+
+    if color_count < 1:
+        raise ValueError("A board needs at least one colour")
+
+    extra = ["COLOR_{}".format(i)
+             for i in range(len(BOARD_COLORS), color_count)]
+
+    return (BOARD_COLORS + extra)[:color_count]
+
+def both_directions(pairs):
+    """
+    Given unordered pairs of vertices, returns the edges running both ways.
+
+    >>> both_directions([(1,2), (2,3)])
+    [(1, 2), (2, 1), (2, 3), (3, 2)]
+    """
+
+    return [edge for x,y in pairs for edge in ((x,y), (y,x))]
+
+def random_edges(vertex_count, average_degree = 4, seed = None):
+    """
+    Returns the edges of a uniformly random graph on the vertices
+    1 to vertex_count with the given average degree.
+
+    >>> len(random_edges(10, 4, seed = 1))
+    40
+    >>> random_edges(10, 4, seed = 1) == random_edges(10, 4, seed = 1)
+    True
+    """
+
+    rng = random.Random(seed)
+
+    max_pairs = vertex_count*(vertex_count - 1)//2
+    pair_count = min(max_pairs, vertex_count*average_degree//2)
+
+    pairs = set()
+
+    # Sampling pairs until we have enough is linear as long as the graph is
+    # sparse, which is the case random graphs are meant for.
+    while len(pairs) < pair_count:
+        x = rng.randint(1, vertex_count)
+        y = rng.randint(1, vertex_count)
+
+        if x != y:
+            pairs.add((min(x,y), max(x,y)))
+
+    return both_directions(sorted(pairs))
+
+def grid_edges(vertex_count, seed = None):
+    """
+    Returns the edges of the most square grid which holds the vertices
+    1 to vertex_count, filled row by row. The seed is unused, and is only
+    accepted so that every generator can be called the same way.
+
+    >>> grid_edges(4)
+    [(1, 2), (2, 1), (1, 3), (3, 1), (2, 4), (4, 2), (3, 4), (4, 3)]
+    """
+
+    width = max(1, ceil(sqrt(vertex_count)))
+    pairs = []
+
+    for vertex in range(1, vertex_count + 1):
+        if vertex % width != 0 and vertex + 1 <= vertex_count:
+            pairs.append((vertex, vertex + 1))
+
+        if vertex + width <= vertex_count:
+            pairs.append((vertex, vertex + width))
+
+    return both_directions(pairs)
+
+def scale_free_edges(vertex_count, attachments = 2, seed = None):
+    """
+    Returns the edges of a scale free graph on the vertices 1 to vertex_count,
+    grown by preferential attachment. Each new vertex is joined to the given
+    number of existing vertices, chosen in proportion to their degree.
+
+    >>> edges = scale_free_edges(100, 2, seed = 3)
+    >>> len(edges)
+    394
+    >>> all(x != y for x,y in edges)
+    True
+    """
+
+    rng = random.Random(seed)
+
+    pairs = []
+
+    # Every vertex appears in this list once per edge it is on, so picking
+    # uniformly from it picks vertices in proportion to their degree.
+    endpoints = []
+
+    for vertex in range(1, vertex_count + 1):
+        targets = set()
+        wanted = min(attachments, vertex - 1)
+
+        while len(targets) < wanted:
+            if endpoints:
+                targets.add(rng.choice(endpoints))
+            else:
+                targets.add(rng.randint(1, vertex - 1))
+
+        for target in targets:
+            pairs.append((target, vertex))
+            endpoints += [target, vertex]
+
+    return both_directions(pairs)
+
+def near_complete_edges(vertex_count, missing = 0.1, seed = None):
+    """
+    Returns the edges of a complete graph on the vertices 1 to vertex_count,
+    with roughly the given fraction of edges left out. These graphs have a
+    quadratic number of edges, so they are only practical for small boards.
+
+    >>> len(near_complete_edges(10, 0))
+    90
+    >>> len(near_complete_edges(10, 0.5, seed = 2)) < 90
+    True
+    """
+
+    rng = random.Random(seed)
+
+    pairs = [(x,y) for x in range(1, vertex_count + 1)
+             for y in range(x + 1, vertex_count + 1)
+             if rng.random() >= missing]
+
+    return both_directions(pairs)
+
+TOPOLOGIES = {
+    "random": random_edges,
+    "grid": grid_edges,
+    "scale_free": scale_free_edges,
+    "near_complete": near_complete_edges,
+}
+
+def random_colors(vertex_count, color_count = 4, seed = None):
+    """
+    Returns a list of vertex, colour pairs for the vertices 1 to vertex_count,
+    with every colour picked uniformly at random.
+
+    >>> random_colors(3, 2, seed = 0)
+    [(1, 'GREEN'), (2, 'GREEN'), (3, 'RED')]
+    """
+
+    rng = random.Random(seed)
+    colors = board_colors(color_count)
+
+    return [(vertex, rng.choice(colors))
+            for vertex in range(1, vertex_count + 1)]
+
+def make_board(topology, vertex_count, color_count = 4, seed = None):
+    """
+    Creates a ColorGraph with the given topology (one of the keys of
+    TOPOLOGIES), number of vertices and number of colours.
+
+    >>> board = make_board("grid", 9, 3, seed = 5)
+    >>> len(board.graph.vertices())
+    9
+    >>> len(board.graph.edges())
+    24
+    """
+
+    if topology not in TOPOLOGIES:
+        raise ValueError("Unknown topology {}".format(topology))
+
+    edges = TOPOLOGIES[topology](vertex_count, seed = seed)
+    vertex_colors = random_colors(vertex_count, color_count, seed)
+
+    return ColorGraph(vertex_colors, edges)
+
+def match_free_colors(graph, colors, rng, quotas = None):
+    """
+    Colours every vertex of the graph so that no group of 3 or more
+    vertices of one colour is connected, or returns None if the colouring
+    ran into a vertex with no colour left to give it. If quotas are given,
+    quotas[i] is exactly how many vertices get colors[i].
+
+    Each uncoloured vertex keeps track of, for every colour, how many of its
+    neighbours have that colour and whether one of them is already in a pair.
+    A colour stays possible for a vertex while it has no neighbour of that
+    colour, or a single unpaired one. The vertex with the fewest possible
+    colours is coloured next, so choices are forced as early as possible.
+    Vertices joined by an edge going either way are neighbours, as they are
+    for groups.
+
+    >>> board = ColorGraph([(v, None) for v in range(1, 10)], grid_edges(9))
+    >>> vertex_colors = match_free_colors(board.graph, ["RED", "BLUE"],
+    ...                                   random.Random(1))
+    >>> board.vertex_colors = vertex_colors
+    >>> max(len(x) for x in board.partition_graph())
+    2
+    """
+
+    adjacency = {vertex: graph.adjacent(vertex)
+                 for vertex in graph.adjacency_dict}
+    color_count = len(colors)
+
+    vertex_colors = {}
+    partner = {}
+
+    # For each vertex, how many neighbours have each colour, and whether
+    # any neighbour of that colour is paired.
+    neighbor_counts = {vertex: [0]*color_count for vertex in adjacency}
+    paired_neighbor = {vertex: [False]*color_count for vertex in adjacency}
+
+    def possible_colors(vertex):
+        counts = neighbor_counts[vertex]
+        paired = paired_neighbor[vertex]
+
+        return [i for i in range(color_count)
+                if (counts[i] == 0 or (counts[i] == 1 and not paired[i]))
+                and (quotas is None or quotas[i] > 0)]
+
+    if quotas is not None:
+        quotas = list(quotas)
+
+    # Entries are (possible colour count, -degree, tie breaker, vertex). An
+    # entry goes stale when its vertex loses a colour, so stale entries are
+    # put back with their real count when they come off the heap.
+    heap = [(color_count, -len(neighbors), rng.random(), vertex)
+            for vertex, neighbors in adjacency.items()]
+    heapq.heapify(heap)
+
+    while heap:
+        size, _, _, vertex = heapq.heappop(heap)
+
+        if vertex in vertex_colors:
+            continue
+
+        possible = possible_colors(vertex)
+
+        if len(possible) != size:
+            heapq.heappush(heap, (len(possible), -len(adjacency[vertex]),
+                                  rng.random(), vertex))
+            continue
+
+        if not possible:
+            return None
+
+        if quotas is None:
+            color = rng.choice(possible)
+        else:
+            # Colours with more vertices left to fill are picked more often,
+            # so no colour is left over for the last few vertices.
+            color = rng.choices(possible, [quotas[i] for i in possible])[0]
+            quotas[color] -= 1
+
+        vertex_colors[vertex] = colors[color]
+
+        changed = set()
+
+        for neighbor in adjacency[vertex]:
+            if vertex_colors.get(neighbor) == colors[color]:
+                partner[vertex] = neighbor
+                partner[neighbor] = vertex
+
+            neighbor_counts[neighbor][color] += 1
+            changed.add(neighbor)
+
+        # A new pair rules its colour out for every neighbour of the pair.
+        if vertex in partner:
+            for paired_vertex in (vertex, partner[vertex]):
+                for neighbor in adjacency[paired_vertex]:
+                    paired_neighbor[neighbor][color] = True
+                    changed.add(neighbor)
+
+        for neighbor in changed:
+            if neighbor not in vertex_colors:
+                heapq.heappush(heap, (len(possible_colors(neighbor)),
+                    -len(adjacency[neighbor]), rng.random(), neighbor))
+
+    return vertex_colors
+
+def count_legal_moves(board, stop_at = None):
+    """
+    Counts the pairs of vertices on a board which can be swapped to make a
+    group of 3, stopping early once stop_at pairs have been found.
+
+    >>> board = ColorGraph([(1,"RED"), (2,"BLUE"), (3,"RED"), (4,"RED")],
+    ...                    both_directions([(1,2), (2,3), (3,4)]))
+    >>> count_legal_moves(board)
+    1
+    """
+
+    moves = set()
+
+    for vertex_from, vertex_to in board.legal_moves():
+        moves.add(frozenset((vertex_from, vertex_to)))
+
+        if stop_at is not None and len(moves) >= stop_at:
+            break
+
+    return len(moves)
+
+def playable_board(topology, vertex_count, color_count = 4, min_moves = 1,
+                   seed = None, attempts = 20):
+    """
+    Creates a ColorGraph with the given topology, number of vertices and
+    number of colours, which starts without any group of 3 and has at least
+    min_moves legal swaps. Colourings are retried up to the given number of
+    attempts before giving up with a ValueError.
+
+    >>> board = playable_board("random", 200, 4, min_moves = 5, seed = 7)
+    >>> max(len(x) for x in board.partition_graph())
+    2
+    >>> count_legal_moves(board, stop_at = 5)
+    5
+    """
+
+    if topology not in TOPOLOGIES:
+        raise ValueError("Unknown topology {}".format(topology))
+
+    rng = random.Random(seed)
+    colors = board_colors(color_count)
+
+    edges = TOPOLOGIES[topology](vertex_count, seed = seed)
+    board = ColorGraph([(vertex, None)
+                        for vertex in range(1, vertex_count + 1)], edges)
+
+    for attempt in range(attempts):
+        vertex_colors = match_free_colors(board.graph, colors, rng)
+
+        if vertex_colors is None:
+            continue
+
+        board.vertex_colors = vertex_colors
+
+        if count_legal_moves(board, min_moves) >= min_moves:
+            return board
+
+    raise ValueError("Could not colour a {} board of {} vertices with {} "
+                     "colours and {} moves".format(topology, vertex_count,
+                                                   color_count, min_moves))
@@ -0,0 +1,522 @@
+import random
+
+from .graph import Graph
+from itertools import chain, product
+
+class ColorGraphObserver():
+    """
+    Something which wants to be told about every change made to a ColorGraph,
+    like a tracker of legal moves. Observers are added to the observers list
+    of a ColorGraph, and should override the methods they care about.
+    """
+
+    def vertex_added(self, vertex, color):
+        pass
+
+    def vertex_removed(self, vertex, neighbors):
+        pass
+
+    def edge_added(self, vertex_from, vertex_to):
+        pass
+
+    def color_changed(self, vertex, color):
+        pass
+
+    def colors_swapped(self, vertex_1, vertex_2):
+        pass
+
+    def score_changed(self, change):
+        pass
+
+class ColorGraph():
+    """
+    A graph with added functionality to add colour to each of the nodes, along
+    with added functionality for implementing the matching game.
+    """
+
+    def __init__(self, vertex_colors = [], edges = []):
+        """
+        Given a list of vertex, color tuples, and a list of edges, this
+        function creates a ColorGraph.
+
+        >>> a = ColorGraph([(1,"RED"),(2,"BLUE")],[(1,2)])
+        >>> a.graph.adjacency_dict
+        {1: {2}, 2: set()}
+        >>> a.vertex_colors
+        {1: 'RED', 2: 'BLUE'}
+        """
+
+        # Bumped by every change of colour, which together with the version
+        # of the graph tells when cached results are out of date.
+        self.color_version = 0
+        self._cache = {}
+        self._cache_version = None
+        self._swap_preview = None
+
+        self.vertex_colors = {vertex:color for vertex,color in vertex_colors}
+
+        vertices = [vertex for vertex, color in vertex_colors]
+        self.graph = Graph(vertices, edges)
+        self.score = 0
+
+        # Objects subclassing ColorGraphObserver, told about every change.
+        self.observers = []
+
+    @property
+    def vertex_colors(self):
+        return self._vertex_colors
+
+    @vertex_colors.setter
+    def vertex_colors(self, vertex_colors):
+        self._vertex_colors = vertex_colors
+        self.color_version += 1
+
+    @property
+    def version(self):
+        """
+        A number which changes whenever the graph or its colours change.
+
+        >>> a = ColorGraph([(1,"RED"),(2,"BLUE")])
+        >>> version = a.version
+        >>> a.swap_colors(1, 2)
+        >>> a.version == version
+        False
+        """
+
+        # Both counters only ever go up, so their sum never repeats.
+        return self.graph.version + self.color_version
+
+    def cached(self, name, compute):
+        """
+        Returns the result of compute() cached under the given name, only
+        calling compute if the graph or its colours have changed since it was
+        last cached.
+        """
+
+        if self._cache_version != self.version:
+            self._cache = {}
+            self._cache_version = self.version
+
+        if name not in self._cache:
+            self._cache[name] = compute()
+
+        return self._cache[name]
+
+    def clear_cache(self):
+        """
+        Forgets everything cached, so that it is worked out again the next
+        time it is asked for, even if nothing has changed.
+
+        >>> a = ColorGraph([(1,"RED"),(2,"RED")], [(1,2)])
+        >>> partitions = a.partition_graph()
+        >>> a.partition_graph() is partitions
+        True
+        >>> a.clear_cache()
+        >>> a.partition_graph() is partitions
+        False
+        """
+
+        self._cache = {}
+
+    def add_vertex(self, vertex, color):
+        """
+        Given a vertex and its colour, adds it to a colour graph.
+
+        >>> a = ColorGraph()
+        >>> a.add_vertex(1, "RED")
+        >>> a.vertex_colors
+        {1: 'RED'}
+        >>> a.add_vertex(2,"BLUE")
+        >>> a.vertex_colors
+        {1: 'RED', 2: 'BLUE'}
+        """
+
+        self.graph.add_vertex(vertex)
+        self.vertex_colors[vertex] = color
+        self.color_version += 1
+
+        for observer in self.observers:
+            observer.vertex_added(vertex, color)
+
+    def add_edge(self, vertex_from, vertex_to):
+        """
+        Adds an edge between two vertices already in the graph.
+
+        >>> a = ColorGraph([(1,"RED"),(2,"BLUE")])
+        >>> a.add_edge(1, 2)
+        >>> a.graph.edges()
+        [(1, 2)]
+        """
+
+        self.graph.add_edge(vertex_from, vertex_to)
+
+        for observer in self.observers:
+            observer.edge_added(vertex_from, vertex_to)
+
+    def get_color(self, vertex):
+        """
+        Returns the colour corresponding to the given vertex in the graph.
+
+        >>> a = ColorGraph([(1,"RED"), (2,"BLUE")], [])
+        >>> a.get_color(1)
+        'RED'
+        >>> a.get_color(2)
+        'BLUE'
+        """
+
+        if not self.graph.is_vertex(vertex):
+            raise ValueError("Vertex {} not in graph".format(vertex))
+
+        return self.vertex_colors[vertex]
+
+    def get_score(self):
+        return self.score
+
+    def change_score(self, change):
+        self.score += change
+
+        for observer in self.observers:
+            observer.score_changed(change)
+
+    def set_color(self, vertex, color):
+        """
+        Changes the colour of a vertex in the graph.
+
+        >>> a = ColorGraph([(1,"RED")])
+        >>> a.set_color(1, "BLUE")
+        >>> a.get_color(1)
+        'BLUE'
+        """
+
+        if not self.graph.is_vertex(vertex):
+            raise ValueError("Vertex {} not in graph".format(vertex))
+
+        self.vertex_colors[vertex] = color
+        self.color_version += 1
+
+        for observer in self.observers:
+            observer.color_changed(vertex, color)
+
+    def get_random_color(self):
+        """
+        Chooses a random color for a vertex from a specific selection.
+        """
+
+        COLORS = ["RED", "GREEN", "BLUE", "PURPLE"]
+
+        random.seed()
+        return random.choice(COLORS)
+
+    def swap_colors(self, vertex_1, vertex_2):
+        """
+        Swaps the colours of two vertices in the graph.
+
+        >>> a = ColorGraph([(1,"RED"),(2,"BLUE")])
+        >>> a.swap_colors(1,2)
+        >>> a.get_color(1)
+        'BLUE'
+        >>> a.get_color(2)
+        'RED'
+        """
+
+        self.exchange_colors(vertex_1, vertex_2)
+
+        for observer in self.observers:
+            observer.colors_swapped(vertex_1, vertex_2)
+
+    def exchange_colors(self, vertex_1, vertex_2):
+        """
+        Swaps the colours of two vertices without telling any observers, for
+        trying out a swap which is undone straight after.
+        """
+
+        self.vertex_colors[vertex_1], self.vertex_colors[vertex_2]      \
+          = self.get_color(vertex_2), self.get_color(vertex_1)
+
+        self.color_version += 1
+
+    def find_partition(self, start_node):
+        """
+        Given a node, this function finds all other nodes connected in a
+        component like fashion with the same color. Like every group on the
+        board, the direction of edges does not matter.
+
+        >>> c = ColorGraph([(1,"RED"), (2,"RED"), (3,"RED"), (4,"BLUE")], \
+                           [(1,2), (3,2), (3,4)])
+        >>> sorted(c.find_partition(1))
+        [1, 2, 3]
+        """
+
+        return set(self.graph.depth_first_search(start_node,
+                                                 self.vertex_colors,
+                                                 undirected = True))
+
+    def partition_graph(self):
+        """
+        Partitions graph into sets of nodes connected together, by edges going
+        either way, which have the same colour. The partition is cached until
+        the graph next changes, so it should not be modified.
+
+        >>> c_colors = [(1, "RED"),  (2, "RED"), (3, "RED"), (4, "BLUE"), \
+                        (5, "BLUE"), (6, "RED"), (7, "RED")]
+        >>> c_edges = [(1,2), (2,3), (1,4), (3,5), (5,6), (4,7)]
+        >>> c = ColorGraph(c_colors, c_edges)
+        >>> c.partition_graph()
+        [{1, 2, 3}, {4}, {5}, {6}, {7}]
+        """
+
+        return self.cached("partitions", lambda:
+                           self.graph.connected_components(self.vertex_colors))
+
+    def can_swap(self, vertex_1, vertex_2):
+        """
+        Checks if two vertices can be swapped, given the limitations of the
+        game (vertices swapped must make a group of 3).
+
+        >>> c_colors = [(1, "RED"),  (2, "RED"), (3, "RED"), (4, "BLUE"), \
+                        (5, "BLUE"), (6, "RED"), (7, "RED")]
+        >>> c_edges = [(1,2), (2,3), (1,4), (3,5), (5,6), (4,7)]
+        >>> c = ColorGraph(c_colors, c_edges)
+        >>> c.can_swap(5, 6)
+        True
+        >>> c.can_swap(4, 5)
+        False
+        """
+
+        # We cannot swap two nodes if they don't have an edge between them.
+        if self.graph.is_edge(vertex_1, vertex_2):
+            preview = self._swap_preview
+
+            if preview is not None and \
+                    preview[:3] == (self.version, vertex_1, vertex_2):
+                partitions = preview[3]
+            else:
+                self.exchange_colors(vertex_1, vertex_2)
+                partitions = self.partition_graph()
+                self.exchange_colors(vertex_1, vertex_2)
+
+                # The swap is usually made straight after, so the partition
+                # is kept for swap_vertices to reuse.
+                self._swap_preview = (self.version, vertex_1, vertex_2,
+                                      partitions)
+
+            # If we have a group of 3, then we can definitely swap the two.
+            if [x for x in partitions if len(x) >= 3]:
+                return True
+
+        return False
+
+    def swapped_group_size(self, vertex, color, swapped, swapped_color,
+                           limit = 3):
+        """
+        Counts the vertices in the group of the given colour around vertex,
+        as if vertex had that colour and the vertex swapped had swapped_color.
+        The search stops once limit vertices are found, so only the vertices
+        close to the swap are looked at.
+
+        >>> c = ColorGraph([(1,"RED"), (2,"BLUE"), (3,"RED"), (4,"RED")], \
+                           [(1,2), (2,1), (2,3), (3,2), (3,4), (4,3)])
+        >>> c.swapped_group_size(2, "RED", 1, "BLUE")
+        3
+        >>> c.swapped_group_size(1, "BLUE", 2, "RED")
+        1
+        """
+
+        vertex_colors = self.vertex_colors
+        adjacency_dict = self.graph.adjacency_dict
+        incoming_dict = self.graph.incoming_dict
+
+        group = {vertex}
+        to_visit = [vertex]
+
+        while to_visit and len(group) < limit:
+            current = to_visit.pop()
+
+            for neighbor in chain(adjacency_dict[current],
+                                  incoming_dict[current]):
+                if neighbor == swapped:
+                    neighbor_color = swapped_color
+                else:
+                    neighbor_color = vertex_colors[neighbor]
+
+                if neighbor_color == color and neighbor not in group:
+                    group.add(neighbor)
+                    to_visit.append(neighbor)
+
+        return len(group)
+
+    def creates_match(self, vertex_1, vertex_2):
+        """
+        Checks if swapping two vertices makes a group of 3 containing one of
+        them. Unlike can_swap, this only looks at the vertices around the swap,
+        so it agrees with can_swap on any board without a group of 3 already,
+        which is every board between moves.
+
+        >>> c = ColorGraph([(1,"RED"), (2,"BLUE"), (3,"RED"), (4,"RED")], \
+                           [(1,2), (2,1), (2,3), (3,2), (3,4), (4,3)])
+        >>> c.creates_match(1, 2)
+        True
+        >>> c.creates_match(3, 4)
+        False
+
+        Groups follow edges either way, so on a board whose edges only go
+        one way it still agrees with can_swap and with the MoveTracker.
+
+        >>> from matchgraph.moves import MoveTracker
+        >>> c = ColorGraph([(1,"RED"), (2,"BLUE"), (3,"RED"), (4,"RED")], \
+                           [(1,2), (3,2), (4,3)])
+        >>> c.can_swap(1, 2), c.creates_match(1, 2)
+        (True, True)
+        >>> MoveTracker(c).is_deadlocked()
+        False
+        """
+
+        if not self.graph.is_edge(vertex_1, vertex_2):
+            return False
+
+        color_1 = self.vertex_colors[vertex_1]
+        color_2 = self.vertex_colors[vertex_2]
+
+        # Swapping two vertices of the same colour never changes anything.
+        if color_1 == color_2:
+            return False
+
+        return (self.swapped_group_size(vertex_1, color_2,
+                                        vertex_2, color_1) >= 3 or
+                self.swapped_group_size(vertex_2, color_1,
+                                        vertex_1, color_2) >= 3)
+
+    def legal_moves(self):
+        """
+        Yields every edge of the graph whose vertices can be swapped to make a
+        group of 3, assuming no group of 3 is already on the board.
+
+        >>> c = ColorGraph([(1,"RED"), (2,"BLUE"), (3,"RED"), (4,"RED")], \
+                           [(1,2), (2,1), (2,3), (3,2), (3,4), (4,3)])
+        >>> sorted(c.legal_moves())
+        [(1, 2), (2, 1)]
+        """
+
+        for vertex_from, vertex_to in self.graph.edges():
+            if self.creates_match(vertex_from, vertex_to):
+                yield vertex_from, vertex_to
+
+    def remove_vertex(self, vertex):
+        """
+        Removes a vertex from the graph.
+
+        >>> a = ColorGraph([(1,"RED"),(2,"BLUE")],[(1,2)])
+        >>> a.remove_vertex(1)
+        >>> a.graph.adjacency_dict
+        {2: set()}
+        >>> a.vertex_colors
+        {2: 'BLUE'}
+        """
+
+        neighbors = list(self.graph.adjacent(vertex))
+
+        self.vertex_colors.pop(vertex)
+        self.color_version += 1
+        self.graph.remove_vertex(vertex)
+
+        for observer in self.observers:
+            observer.vertex_removed(vertex, neighbors)
+
+    def remove_partitions(self, partitions):
+        """
+        Removes all partitions specified, adding edges between all the
+        nodes originally connected to the partition. Returns a list of all
+        nodes deleted.
+
+        >>> c = ColorGraph([(1,"BLUE"), (2,"RED"), (3,"RED"), (4,"RED"), \
+                            (5,"GREEN")], [(1,2), (2,1), (2,3), (3,2), \
+                            (3,4), (4,3), (4,5), (5,4)])
+        >>> sorted(c.remove_partitions([{2, 3, 4}]))
+        [2, 3, 4]
+        >>> c.graph.adjacency_dict
+        {1: {5}, 5: {1}}
+        >>> c.get_score()
+        3
+        """
+
+        deleted = []
+
+        for partition in partitions:
+            self.change_score(len(partition))
+
+            neighbors = {y for x in partition for y in self.graph.adjacent(x)}
+            new_neighbors = [x for x in neighbors if x not in partition]
+
+            possible_connect = product(new_neighbors, new_neighbors)
+            to_connect = [(x,y) for x,y in possible_connect
+                          if x != y and not self.graph.is_edge(x, y)]
+
+            for vertex_1, vertex_2 in to_connect:
+                self.add_edge(vertex_1, vertex_2)
+
+            for element in partition:
+                self.remove_vertex(element)
+                deleted.append(element)
+
+        return deleted
+
+    def swap_vertices(self, vertex_1, vertex_2):
+        """
+        Checks if two vertices can be swapped, and if they can, swaps the two
+        nodes and deletes all other nodes that would be deleted from the swap.
+        The function returns the score scored and a list of vertices deleted.
+
+        >>> c = ColorGraph([(1,"RED"), (2,"BLUE"), (3,"RED"), (4,"RED")], \
+                           [(1,2), (2,1), (2,3), (3,2), (3,4), (4,3)])
+        >>> c.swap_vertices(1, 2)
+        (3, [2, 3, 4])
+        >>> c.swap_vertices(1, 2)
+        (0, [])
+        """
+
+        deleted = []
+        score_before = self.get_score()
+
+        if not self.can_swap(vertex_1, vertex_2):
+            return 0, deleted
+
+        version = self.version
+        preview = self._swap_preview
+        self.swap_colors(vertex_1, vertex_2)
+
+        if preview is not None and preview[:3] == (version, vertex_1, vertex_2):
+            self._cache = {"partitions": preview[3]}
+            self._cache_version = self.version
+
+        deletable = [x for x in self.partition_graph() if len(x) > 2]
+
+        while deletable:
+            deleted += self.remove_partitions(deletable)
+
+            # We now see if we've caused a chain reaction, in which case
+            # we start the deletion process all over again.
+            deletable = [x for x in self.partition_graph() if len(x) > 2]
+
+        return self.get_score() - score_before, deleted
+
+    def get_two_partitions(self):
+        """
+        Returns all color partitions in the graph that have 2 or more elements.
+        The set is cached until the graph next changes, so it should not be
+        modified.
+
+        >>> c = ColorGraph([(1,"RED"), (2,"RED"), (3,"BLUE")], [(1,2), (2,3)])
+        >>> c.get_two_partitions() == {1, 2}
+        True
+        >>> c.get_two_partitions() is c.get_two_partitions()
+        True
+        >>> c.swap_colors(2, 3)
+        >>> c.get_two_partitions()
+        set()
+        """
+
+        return self.cached("two_partitions", self._find_two_partitions)
+
+    def _find_two_partitions(self):
+        large_partitions = [x for x in self.partition_graph() if len(x) > 1]
+        return {x for partition in large_partitions for x in partition}
\ No newline at end of file
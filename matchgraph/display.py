@@ -0,0 +1,192 @@
+"""
+display.py
+
+Keeps what is drawn for every vertex, its position, velocity, radius and
+colour, in parallel arrays indexed by a dense number given to each vertex.
+Loops over every vertex, like drawing and laying out, then run along a few
+flat arrays of numbers instead of visiting one small object per vertex.
+"""
+
+from array import array
+from zlib import crc32
+from .vector import Vector
+
+def vertex_size(vertex):
+    """
+    Returns the pixel radius of a vertex, between 100 and 150. It only
+    depends on the vertex's name, so a board is drawn the same way, and keeps
+    the same place in the layout cache, every time it is played.
+
+    >>> 100 <= vertex_size(1) <= 150
+    True
+    >>> vertex_size(1) == vertex_size(1)
+    True
+    """
+
+    return 100 + crc32(repr(vertex).encode())%51
+
+class DisplayState():
+    """
+    The positions, velocities, radii and colours of a set of vertices. Vertex
+    number i has position (x[i], y[i]), velocity (vx[i], vy[i]), radius
+    radius[i] and colour palette[color[i]], and is vertices[i]. Removing a
+    vertex moves the last vertex into its number, so the arrays never have
+    gaps, and numbers are only valid until the next removal.
+
+    >>> state = DisplayState()
+    >>> state.add(1, 0, 0, "RED")
+    >>> state.add(2, 10, 0, "BLUE")
+    >>> state.add(3, 20, 0, "RED")
+    >>> state.remove(1)
+    >>> state.vertices, state.number[3]
+    ([3, 2], 0)
+    >>> tuple(state.position(3)), state.get_color(3)
+    ((20.0, 0.0), 'RED')
+    >>> 1 in state, len(state)
+    (False, 2)
+    """
+
+    def __init__(self):
+        self.vertices = []
+        self.number = {}
+
+        self.x = array("d")
+        self.y = array("d")
+        self.vx = array("d")
+        self.vy = array("d")
+        self.radius = array("d")
+        self.color = array("H")
+
+        # Colours are stored as indices into the palette.
+        self.palette = []
+        self.palette_index = {}
+
+    def __len__(self):
+        return len(self.vertices)
+
+    def __contains__(self, vertex):
+        return vertex in self.number
+
+    def __iter__(self):
+        return iter(self.vertices)
+
+    def color_index(self, color):
+        """ Returns the palette index of a colour, adding it if it is new. """
+
+        if color not in self.palette_index:
+            self.palette_index[color] = len(self.palette)
+            self.palette.append(color)
+
+        return self.palette_index[color]
+
+    def add(self, vertex, x, y, color = None, radius = None):
+        """
+        Adds a vertex at the given position, at rest, or moves it there if
+        it is already present. Its radius defaults to vertex_size(vertex).
+        """
+
+        if vertex in self.number:
+            self.move(vertex, x, y)
+            return
+
+        self.number[vertex] = len(self.vertices)
+        self.vertices.append(vertex)
+
+        self.x.append(x)
+        self.y.append(y)
+        self.vx.append(0)
+        self.vy.append(0)
+        self.radius.append(vertex_size(vertex) if radius is None else radius)
+        self.color.append(self.color_index(color))
+
+    def remove(self, vertex):
+        """ Removes a vertex, if present, in constant time. """
+
+        i = self.number.pop(vertex, None)
+
+        if i is None:
+            return
+
+        last = len(self.vertices) - 1
+
+        for values in (self.x, self.y, self.vx, self.vy, self.radius,
+                       self.color):
+            values[i] = values[last]
+            values.pop()
+
+        moved = self.vertices.pop()
+
+        if i != last:
+            self.vertices[i] = moved
+            self.number[moved] = i
+
+    def clear(self):
+        self.vertices.clear()
+        self.number.clear()
+
+        for values in (self.x, self.y, self.vx, self.vy, self.radius,
+                       self.color):
+            del values[:]
+
+    def position(self, vertex):
+        i = self.number[vertex]
+
+        return Vector(self.x[i], self.y[i])
+
+    def move(self, vertex, x, y):
+        """ Moves a vertex, remembering how far it went as its velocity. """
+
+        i = self.number[vertex]
+
+        self.vx[i] = x - self.x[i]
+        self.vy[i] = y - self.y[i]
+        self.x[i] = x
+        self.y[i] = y
+
+    def get_radius(self, vertex):
+        return self.radius[self.number[vertex]]
+
+    def get_color(self, vertex):
+        return self.palette[self.color[self.number[vertex]]]
+
+    def set_color(self, vertex, color):
+        if vertex in self.number:
+            self.color[self.number[vertex]] = self.color_index(color)
+
+    def swap_positions(self, vertex_1, vertex_2):
+        i, j = self.number[vertex_1], self.number[vertex_2]
+
+        for values in (self.x, self.y, self.vx, self.vy):
+            values[i], values[j] = values[j], values[i]
+
+    def swap_colors(self, vertex_1, vertex_2):
+        if vertex_1 in self.number and vertex_2 in self.number:
+            i, j = self.number[vertex_1], self.number[vertex_2]
+            self.color[i], self.color[j] = self.color[j], self.color[i]
+
+    def positions(self):
+        """ Returns a dictionary from every vertex to its (x, y) position. """
+
+        return dict(zip(self.vertices, zip(self.x, self.y)))
+
+    def vertex_at(self, x, y, margin = 0):
+        """
+        Returns the first vertex whose circle, widened by margin, contains the
+        point (x, y), or None.
+
+        >>> state = DisplayState()
+        >>> state.add("a", 0, 0, radius = 10)
+        >>> state.vertex_at(3, 4), state.vertex_at(30, 0)
+        ('a', None)
+        """
+
+        for i, (vertex_x, vertex_y, radius) in enumerate(zip(self.x, self.y,
+                                                             self.radius)):
+            x_distance = x - vertex_x
+            y_distance = y - vertex_y
+            reach = radius + margin
+
+            if x_distance*x_distance + y_distance*y_distance < reach*reach:
+                return self.vertices[i]
+
+        return None
@@ -0,0 +1,362 @@
+"""
+eventlog.py
+
+Records a game as a compact binary log of the changes made to its board,
+and replays the log to rebuild the board as it was after any move.
+
+A log starts with a header, then the starting board as vertex and edge
+records, then a start record, then every change made during the game. Each
+record is a one byte kind followed by fixed size little endian fields.
+Vertices are stored as unsigned 32 bit numbers, and colours as one byte
+numbers, each colour's name being recorded the first time it is used.
+Every swap begins a new move.
+"""
+
+import mmap
+import struct
+
+from .colorgraph import ColorGraph, ColorGraphObserver
+
+MAGIC = b"MGLOG\x01"
+
+NAME, VERTEX, EDGE, REMOVE, SWAP, COLOR, SCORE, START = range(8)
+
+# The fields following the kind byte of each record. Name records are
+# followed by the given number of bytes of UTF-8 as well.
+RECORDS = {
+    NAME: struct.Struct("<BH"),
+    VERTEX: struct.Struct("<IB"),
+    EDGE: struct.Struct("<II"),
+    REMOVE: struct.Struct("<I"),
+    SWAP: struct.Struct("<II"),
+    COLOR: struct.Struct("<IB"),
+    SCORE: struct.Struct("<i"),
+    START: struct.Struct("<"),
+}
+
+KIND = struct.Struct("<B")
+
+class EventLog(ColorGraphObserver):
+    """
+    Watches a ColorGraph and writes every change made to it to a binary
+    stream, like a file opened with "wb" or an io.BytesIO.
+
+    >>> import io
+    >>> c = ColorGraph([(1,"RED"), (2,"BLUE"), (3,"RED"), (4,"RED")], \
+                       [(1,2), (2,1), (2,3), (3,2), (3,4), (4,3)])
+    >>> stream = io.BytesIO()
+    >>> log = EventLog(c, stream)
+    >>> c.swap_vertices(1, 2)
+    (3, [2, 3, 4])
+    >>> replay = Replay(stream.getvalue())
+    >>> replay.moves
+    1
+    >>> replay.seek(0).vertex_colors
+    {1: 'RED', 2: 'BLUE', 3: 'RED', 4: 'RED'}
+    >>> board = replay.seek(1)
+    >>> board.vertex_colors, board.get_score()
+    ({1: 'BLUE'}, 3)
+    """
+
+    def __init__(self, colorgraph, stream):
+        """
+        Starts logging the given ColorGraph to a stream, writing out the
+        board as it is now.
+        """
+
+        self.stream = stream
+        self.color_ids = {}
+
+        for vertex in colorgraph.vertex_colors:
+            if not isinstance(vertex, int) or not 0 <= vertex < 2**32:
+                raise ValueError("Vertex {} cannot be logged, as logs need "
+                                 "vertices numbered from 0 to 2**32 - 1"
+                                 .format(vertex))
+
+        stream.write(MAGIC)
+
+        for vertex, color in colorgraph.vertex_colors.items():
+            self.write(VERTEX, vertex, self.color_id(color))
+
+        for vertex_from, vertex_to in colorgraph.graph.edges():
+            self.write(EDGE, vertex_from, vertex_to)
+
+        if colorgraph.get_score():
+            self.write(SCORE, colorgraph.get_score())
+
+        self.write(START)
+
+        colorgraph.observers.append(self)
+
+    def write(self, kind, *fields):
+        self.stream.write(KIND.pack(kind) + RECORDS[kind].pack(*fields))
+
+    def color_id(self, color):
+        """ Returns the number of a colour, recording its name if it is new. """
+
+        if color not in self.color_ids:
+            if len(self.color_ids) == 256:
+                raise ValueError("Logs can only hold 256 colours")
+
+            name = str(color).encode()
+            self.color_ids[color] = len(self.color_ids)
+
+            self.write(NAME, self.color_ids[color], len(name))
+            self.stream.write(name)
+
+        return self.color_ids[color]
+
+    def vertex_added(self, vertex, color):
+        self.write(VERTEX, vertex, self.color_id(color))
+
+    def vertex_removed(self, vertex, neighbors):
+        self.write(REMOVE, vertex)
+
+    def edge_added(self, vertex_from, vertex_to):
+        self.write(EDGE, vertex_from, vertex_to)
+
+    def color_changed(self, vertex, color):
+        self.write(COLOR, vertex, self.color_id(color))
+
+    def colors_swapped(self, vertex_1, vertex_2):
+        self.write(SWAP, vertex_1, vertex_2)
+
+    def score_changed(self, change):
+        self.write(SCORE, change)
+
+def read_events(data, offset = len(MAGIC), end = None):
+    """
+    Reads the records of a log held in a bytes like object, from offset up to
+    end (or the end of the data), yielding the offset, kind and fields of
+    each. The fields of name records are the colour number and its name.
+    """
+
+    if data[:len(MAGIC)] != MAGIC:
+        raise ValueError("Data is not a game log")
+
+    if end is None:
+        end = len(data)
+
+    unpack_kind = KIND.unpack_from
+
+    while offset < end:
+        kind, = unpack_kind(data, offset)
+        record = RECORDS[kind]
+        fields = record.unpack_from(data, offset + 1)
+        next_offset = offset + 1 + record.size
+
+        if kind == NAME:
+            color_id, length = fields
+            name = bytes(data[next_offset:next_offset + length]).decode()
+            fields = (color_id, name)
+            next_offset += length
+
+        yield offset, kind, fields
+        offset = next_offset
+
+class BoardState():
+    """
+    The bare state of a board while a log is replayed: the colour of every
+    vertex, the adjacency and incoming sets of the graph and the score.
+    """
+
+    def __init__(self, vertex_colors = None, adjacency_dict = None,
+                 incoming_dict = None, score = 0):
+        self.vertex_colors = vertex_colors or {}
+        self.adjacency_dict = adjacency_dict or {}
+        self.incoming_dict = incoming_dict or {}
+        self.score = score
+
+    def copy(self):
+        return BoardState(dict(self.vertex_colors),
+                          {vertex: set(neighbors) for vertex, neighbors
+                           in self.adjacency_dict.items()},
+                          {vertex: set(neighbors) for vertex, neighbors
+                           in self.incoming_dict.items()},
+                          self.score)
+
+    def to_colorgraph(self):
+        """ Builds a ColorGraph holding a copy of this state. """
+
+        state = self.copy()
+        colorgraph = ColorGraph()
+
+        colorgraph.vertex_colors = state.vertex_colors
+        colorgraph.graph.adjacency_dict = state.adjacency_dict
+        colorgraph.graph.incoming_dict = state.incoming_dict
+        colorgraph.graph.version += 1
+        colorgraph.score = state.score
+
+        return colorgraph
+
+class Replay():
+    """
+    Rebuilds the board of a logged game as it was after any move, by applying
+    the logged changes without redoing any of the game's work. A copy of the
+    board is kept every checkpoint_interval moves, made while the log is
+    first read, so any seek replays at most checkpoint_interval moves. On a
+    log of a million swaps on a board of 1000 vertices, reading the log takes
+    a few seconds and a seek to any move a few milliseconds.
+    Changes logged before the first swap, like a reshuffle of the starting
+    board, are part of move 0.
+
+    >>> import io
+    >>> c = ColorGraph([(1,"RED"), (2,"BLUE"), (3,"RED"), (4,"RED"), \
+                        (5,"GREEN")], [(1,2), (2,1), (2,3), (3,2), (3,4), \
+                                       (4,3), (4,5), (5,4)])
+    >>> stream = io.BytesIO()
+    >>> log = EventLog(c, stream)
+    >>> c.set_color(5, "BLUE")
+    >>> c.swap_vertices(1, 2)
+    (3, [2, 3, 4])
+    >>> replay = Replay(stream.getvalue())
+    >>> replay.seek(0).vertex_colors[5]
+    'BLUE'
+    >>> replay.seek(1).vertex_colors == c.vertex_colors
+    True
+    """
+
+    def __init__(self, data, checkpoint_interval = 1000):
+        """
+        Indexes the moves of a log held in a bytes like object, replaying
+        the whole log once to make its checkpoints.
+        """
+
+        self.data = data
+        self.checkpoint_interval = checkpoint_interval
+
+        self.colors = {}
+        self.swap_offsets = []
+        self.start_offset = None
+
+        # Board states by move. Move 0 is the starting board with every
+        # change made to it before the first swap.
+        self.checkpoints = {}
+
+        state = BoardState()
+        self.apply_events(state, self.index(state))
+
+        if self.start_offset is None:
+            raise ValueError("Log has no start record")
+
+        self.moves = len(self.swap_offsets)
+
+        if self.moves % checkpoint_interval == 0:
+            self.checkpoints[self.moves] = state
+
+        # The move and state replay is up to.
+        self.position = 0
+        self.state = self.checkpoints[0].copy()
+
+    @classmethod
+    def open(cls, path, checkpoint_interval = 1000):
+        """ Replays the log in the given file, mapping it into memory. """
+
+        with open(path, "rb") as log_file:
+            data = mmap.mmap(log_file.fileno(), 0, access = mmap.ACCESS_READ)
+
+        return cls(data, checkpoint_interval)
+
+    def end_of_move(self, move):
+        """ Returns the offset just after the last record of a move. """
+
+        if move < self.moves:
+            return self.swap_offsets[move]
+
+        return len(self.data)
+
+    def index(self, state):
+        """
+        Yields every record of the log, noting where each move starts and
+        the name of each colour. The records are applied to state as they
+        are yielded, so a copy of it is kept as each checkpoint is reached.
+        """
+
+        interval = self.checkpoint_interval
+
+        for offset, kind, fields in read_events(self.data):
+            if kind == SWAP:
+                move = len(self.swap_offsets)
+
+                if move % interval == 0:
+                    self.checkpoints[move] = state.copy()
+
+                self.swap_offsets.append(offset)
+            elif kind == START:
+                self.start_offset = offset + 1
+            elif kind == NAME:
+                self.colors[fields[0]] = fields[1]
+
+            yield offset, kind, fields
+
+    def apply(self, state, offset, end):
+        """ Applies the records between two offsets to a board state. """
+
+        self.apply_events(state, read_events(self.data, offset, end))
+
+    def apply_events(self, state, events):
+        """ Applies records, as yielded by read_events, to a board state. """
+
+        colors = self.colors
+        vertex_colors = state.vertex_colors
+        adjacency_dict = state.adjacency_dict
+        incoming_dict = state.incoming_dict
+
+        for offset, kind, fields in events:
+            if kind == SWAP:
+                vertex_1, vertex_2 = fields
+                vertex_colors[vertex_1], vertex_colors[vertex_2] = \
+                    vertex_colors[vertex_2], vertex_colors[vertex_1]
+            elif kind == EDGE:
+                adjacency_dict[fields[0]].add(fields[1])
+                incoming_dict[fields[1]].add(fields[0])
+            elif kind == REMOVE:
+                vertex = fields[0]
+
+                # Exactly what Graph.remove_vertex does.
+                for neighbor in adjacency_dict.pop(vertex):
+                    incoming_dict[neighbor].discard(vertex)
+
+                for neighbor in incoming_dict.pop(vertex):
+                    adjacency_dict[neighbor].discard(vertex)
+
+                del vertex_colors[vertex]
+            elif kind == SCORE:
+                state.score += fields[0]
+            elif kind == VERTEX or kind == COLOR:
+                vertex_colors[fields[0]] = colors[fields[1]]
+
+                if kind == VERTEX:
+                    adjacency_dict[fields[0]] = set()
+                    incoming_dict[fields[0]] = set()
+
+    def seek_state(self, move):
+        """
+        Brings the replay's board state to how it was after the given move,
+        starting from the checkpoint before it or the current state, whichever
+        is closer, and returns it. The state returned must not be modified.
+        """
+
+        if not 0 <= move <= self.moves:
+            raise ValueError("Move {} is not in a log of {} moves"
+                             .format(move, self.moves))
+
+        checkpoint = move//self.checkpoint_interval*self.checkpoint_interval
+
+        if not checkpoint <= self.position <= move:
+            self.position = checkpoint
+            self.state = self.checkpoints[checkpoint].copy()
+
+        self.apply(self.state, self.end_of_move(self.position),
+                   self.end_of_move(move))
+        self.position = move
+
+        return self.state
+
+    def seek(self, move):
+        """
+        Returns a ColorGraph of the board as it was after the given move,
+        with move 0 being the board the game started on.
+        """
+
+        return self.seek_state(move).to_colorgraph()
@@ -0,0 +1,156 @@
+"""
+game.py
+
+The matching game itself: opens a window with a board, and lets the player
+swap vertices with the mouse. Run it with python -m matchgraph.
+"""
+
+from sys import exit
+from .boards import both_directions
+from .colorgraph import ColorGraph
+from .layout import Layout
+from .layoutcache import LayoutCache
+from .moves import MoveTracker, reshuffle
+from .render import Renderer
+from .vector import Vector
+
+SCREEN_WIDTH = 1200
+SCREEN_HEIGHT = 1000
+
+DEMO_VERTICES = [(1,"RED"),     (2,"RED"),    (3,"RED"),    (4,"RED"),
+                 (5,"RED"),     (6,"RED"),    (7,"RED"),    (8,"BLUE"),
+                 (9,"BLUE"),    (10,"BLUE"),  (11,"BLUE"),  (12,"BLUE"),
+                 (13,"GREEN"),  (14,"GREEN"), (15,"GREEN"), (16,"GREEN"),
+                 (17,"GREEN"),  (18,"GREEN"), (19,"PURPLE"), (20,"PURPLE"),
+                 (21,"PURPLE"), (22,"PURPLE")]
+DEMO_EDGES = both_directions([
+    ( 1,  2), ( 1,  8), ( 1, 14), ( 1, 19), ( 3,  8), ( 3,  9), ( 3, 14),
+    ( 4, 19), ( 5, 16), ( 6, 12), ( 7, 13), ( 7, 18), ( 7, 22), (10, 19),
+    (10, 16), (11, 16), (12, 17), (12, 18), (12, 21), (15, 19), (16, 20),
+    ( 4, 13), ( 4, 20), ( 5, 21), ( 4, 22), ( 6, 22), ( 9, 11)])
+
+def main(graph = None):
+    """ Plays the game on the given ColorGraph, or on the demo board. """
+
+    if graph is None:
+        graph = ColorGraph(DEMO_VERTICES, DEMO_EDGES)
+
+    moves = MoveTracker(graph)
+
+    renderer = Renderer(SCREEN_WIDTH, SCREEN_HEIGHT)
+    layout = Layout(SCREEN_WIDTH, SCREEN_HEIGHT, "multilevel", None,
+                    LayoutCache())
+    graph.observers.append(layout)
+    pygame = renderer.pygame
+
+    first_mouse_clicked = True
+    first_selected = None
+
+    score = 0
+    to_highlight = set()
+
+    while True:
+        for event in pygame.event.get():
+            if event.type == pygame.MOUSEBUTTONDOWN:
+                # (0, 0) top-left
+                mouse_position = renderer.to_map(pygame.mouse.get_pos())
+                print("Clicked Mouse at {0}".format(mouse_position))
+
+                x = layout.selected_vertex(mouse_position)
+
+                if first_mouse_clicked:
+                    if x:
+                        first_selected = x
+                        first_mouse_clicked = False
+
+                        print(layout.state.get_radius(x))
+                        print("Selected Vertex {}".format(x))
+
+                else:
+                    # If no element was selected
+                    if not x:
+                        first_mouse_clicked = True
+                        first_selected = None
+                        print("Deselected Vertex")
+                    else:
+                        # Do stuff to swap vertices
+                        first_mouse_clicked = True
+
+                        added_score, to_delete = graph.swap_vertices(first_selected, x)
+                        score += added_score
+
+                        if to_delete:
+                            layout.swap_vertices(first_selected, x)
+
+                            for deletion in to_delete:
+                                layout.remove_vertex(deletion)
+
+                            print("Swapping Vertex {} with Vertex {}".format(first_selected, x))
+
+                            if moves.is_deadlocked():
+                                print("No moves left, reshuffling")
+
+                                try:
+                                    reshuffle(graph)
+                                except ValueError:
+                                    print("Board cannot be reshuffled")
+
+                    first_selected = None
+
+            if event.type == pygame.KEYDOWN:
+                keys_pressed = {pygame.key.name(index) for index,key in
+                        enumerate(pygame.key.get_pressed()) if key == 1}
+                print("Clicked {0} key".format(keys_pressed))
+
+                if 'space' in keys_pressed:
+                    renderer.fit(layout)
+
+                if 'left' in keys_pressed:
+                    renderer.offset += Vector(-50, 0)
+
+                if 'right' in keys_pressed:
+                    renderer.offset += Vector(50, 0)
+
+                if 'down' in keys_pressed:
+                    renderer.offset += Vector(0, 50)
+
+                if 'up' in keys_pressed:
+                    renderer.offset += Vector(0, -50)
+
+                if 'z' in keys_pressed:
+                    # Zoom in
+                    renderer.zoom(2)
+
+                if 'x' in keys_pressed:
+                    # Zoom out
+                    renderer.zoom(0.5)
+
+                if 'r' in keys_pressed:
+                    layout.clear()
+
+                if 'c' in keys_pressed:
+                    to_highlight = graph.get_two_partitions()
+
+                if 'v' in keys_pressed:
+                    to_highlight = set()
+
+                if 'escape' in keys_pressed:
+                    layout.store_cached(graph)
+                    print("Finished")
+                    exit()
+
+        if not layout.state:
+            layout.place_new_vertices(graph)
+            renderer.fit(layout)
+
+        layout.place_new_vertices(graph)
+        # The board is laid out in one go, so after that only the area
+        # around each move needs to settle.
+        layout.relax_changes(graph)
+        renderer.update_screen_image(graph, layout)
+
+        if first_selected:
+            renderer.print_selected_vertex(graph, layout, first_selected)
+
+        renderer.print_score(score)
+        renderer.flip()
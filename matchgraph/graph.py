@@ -0,0 +1,528 @@
+"""
+graph.py
+
+Implemented in lectures in CMPUT274 taught by Michael Bowman, Walter Bischov,
+Leah Hackman & Zack friggstadt. Updated by Parash Rahman & Jacob Denson.
+"""
+
+from collections import deque
+from itertools import chain
+
+class Graph:
+    """
+    Implements a graph class with standard features expected in a graph, like
+    searching, pathfinding, and finding the tangent line at a specific point ;)
+    """
+
+    def __init__(self, vertices = [], edges = [], is_directed = True):
+        """
+        Given a list of vertices and edges (a list of tuples of vertex pairs),
+        this function creates a graph with a given set of vertices and edges.
+        If no vertices and edges are specified, an empty graph is created. One
+        can also specify whether the graph is directed or not, which by default
+        is directed.
+
+        >>> a = Graph()
+        >>> a.adjacency_dict == {}
+        True
+        >>> b = Graph([1,2,3], [(1,2), (2,3)], True)
+        >>> b.adjacency_dict
+        {1: {2}, 2: {3}, 3: set()}
+        """
+
+        self.is_directed = is_directed
+
+        self.adjacency_dict = {}
+
+        # The vertices with an edge into each vertex, so that edges can be
+        # followed backwards as well.
+        self.incoming_dict = {}
+
+        # Bumped by every change to the graph, so that results worked out
+        # from the graph can be cached until it next changes.
+        self.version = 0
+        self._cache = {}
+        self._cache_version = 0
+
+        for vertex in vertices:
+            self.add_vertex(vertex)
+
+        for vertex_from, vertex_to in edges:
+            self.add_edge(vertex_from, vertex_to)
+
+    def is_vertex(self, vertex):
+        """
+        Returns true if the given vertex is in the graph.
+
+        >>> a = Graph([1,2])
+        >>> a.is_vertex(1)
+        True
+        >>> a.is_vertex(3)
+        False
+        """
+
+        return vertex in self.adjacency_dict.keys()
+
+    def is_edge(self, vertex_from, vertex_to):
+        """
+        Returns true if the specified edge is in the graph.
+
+        >>> a = Graph([1,2], [(1,2)])
+        >>> a.is_edge(1,2)
+        True
+        >>> a.is_edge(2,1)
+        False
+        >>> a.is_edge(3,1)
+        False
+        """
+
+        # If the first vertex isn't even in the graph, the edge itself can't be.
+        if not self.is_vertex(vertex_from):
+            return False
+
+        return vertex_to in self.adjacency_dict[vertex_from]
+
+    def vertices(self):
+        """
+        Returns a copy of the set of vertices in the graph.
+
+        >>> a = Graph([1,2,3], [(1,2), (2,3)])
+        >>> a.vertices() == {1,2,3}
+        True
+        """
+
+        return set(self.adjacency_dict.keys())
+
+    def cached(self, name, compute):
+        """
+        Returns the result of compute() cached under the given name, only
+        calling compute if the graph has changed since it was last cached.
+
+        >>> a = Graph([1,2])
+        >>> a.cached("size", lambda: len(a.adjacency_dict))
+        2
+        >>> a.add_vertex(3)
+        >>> a.cached("size", lambda: len(a.adjacency_dict))
+        3
+        """
+
+        if self._cache_version != self.version:
+            self._cache = {}
+            self._cache_version = self.version
+
+        if name not in self._cache:
+            self._cache[name] = compute()
+
+        return self._cache[name]
+
+    def edges(self):
+        """
+        Returns a list of edges in the graph. The list is cached until the
+        graph next changes, so it should not be modified.
+
+        >>> a = Graph([1,2,3], [(1,2), (2,3)])
+        >>> a.edges()
+        [(1, 2), (2, 3)]
+
+        >>> b = Graph()
+        >>> b.edges()
+        []
+        """
+
+        return self.cached("edges", self._list_edges)
+
+    def _list_edges(self):
+        edges = [(vertex_from, vertex_to)
+            for vertex_from in self.adjacency_dict.keys()
+            for vertex_to in self.adjacency_dict[vertex_from]]
+
+        return edges
+
+    def add_vertex(self, vertex):
+        """
+        Adds a vertex to the graph.
+
+        >>> a = Graph()
+        >>> a.add_vertex(1)
+        >>> a.vertices()
+        {1}
+        >>> a.add_vertex(2)
+        >>> a.vertices()
+        {1, 2}
+        """
+
+        # Adding a vertex twice to the graph may have been made in error
+        # made in error, we specifically let the user know.
+        if self.is_vertex(vertex):
+            raise ValueError("Vertex {} is already in graph".format(vertex))
+
+        self.adjacency_dict[vertex] = set()
+        self.incoming_dict[vertex] = set()
+        self.version += 1
+
+    def add_edge(self, vertex_from, vertex_to):
+        """
+        Given a tuple of 2 vertices, adds an edge between them. If the graph is
+        undirected, both directions of edge are added. If the graph is directed,
+        an edge from the first to the second is added. Two edges cannot exist
+        between the same two nodes.
+
+        >>> a = Graph([1,2])
+        >>> a.adjacency_dict
+        {1: set(), 2: set()}
+        >>> a.add_edge(1,2)
+        >>> a.adjacency_dict
+        {1: {2}, 2: set()}
+
+        >>> b = Graph([1,2], is_directed = False)
+        >>> b.add_edge(1,2)
+        >>> b.adjacency_dict
+        {1: {2}, 2: {1}}
+        """
+
+        if not self.is_vertex(vertex_from):
+            raise ValueError("Vertex {} is not in graph".format(vertex_from))
+
+        if not self.is_vertex(vertex_to):
+            raise ValueError("Vertex {} is not in graph".format(vertex_to))
+
+        if self.is_edge(vertex_from, vertex_to):
+            raise ValueError("Edge {} already in graph".format(
+                (vertex_from, vertex_to)))
+
+        if self.is_directed:
+            self.adjacency_dict[vertex_from].add(vertex_to)
+            self.incoming_dict[vertex_to].add(vertex_from)
+
+        else:
+            self.adjacency_dict[vertex_from].add(vertex_to)
+            self.adjacency_dict[vertex_to].add(vertex_from)
+            self.incoming_dict[vertex_to].add(vertex_from)
+            self.incoming_dict[vertex_from].add(vertex_to)
+
+        self.version += 1
+
+    def remove_vertex(self, vertex):
+        """
+        Removes a vertex from the graph, also removing all edges connected
+        to the edge and from the edge in the graph.
+
+        >>> a = Graph([1,2,3], [(1,2), (2,3),(3,1)], False)
+        >>> a.remove_vertex(1)
+        >>> a.adjacency_dict
+        {2: {3}, 3: {2}}
+
+        >>> b = Graph([1,2,3], [(1,2), (3,2)])
+        >>> b.remove_vertex(2)
+        >>> b.adjacency_dict, b.incoming_dict
+        ({1: set(), 3: set()}, {1: set(), 3: set()})
+        """
+
+        for other_vertex in self.adjacency_dict.pop(vertex):
+            self.incoming_dict[other_vertex].discard(vertex)
+
+        for other_vertex in self.incoming_dict.pop(vertex):
+            self.adjacency_dict[other_vertex].discard(vertex)
+
+        self.version += 1
+
+    def remove_edge(self, vertex_from, vertex_to):
+        """
+        Removes an edge from the graph
+
+        >>> a = Graph([1,2], [(1,2),(2,1)])
+        >>> a.remove_edge(1,2)
+        >>> a.edges()
+        [(2, 1)]
+
+        >>> b = Graph([1,2], [(1,2)])
+        >>> b.remove_edge(1,2)
+        >>> b.edges()
+        []
+        """
+
+        if not self.is_vertex(vertex_from):
+            raise ValueError("Vertex {} is not in the graph".format(vertex_from))
+
+        if not self.is_vertex(vertex_to):
+            raise ValueError("Vertex {} is not in the graph".format(vertex_to))
+
+        if not self.is_edge(vertex_from, vertex_to):
+            raise ValueError("""Edge from {} to {} does
+                                not exist""".format(vertex_from, vertex_to))
+
+        if self.is_directed:
+            self.adjacency_dict[vertex_from].remove(vertex_to)
+            self.incoming_dict[vertex_to].remove(vertex_from)
+
+        else:
+            self.adjacency_dict[vertex_from].remove(vertex_to)
+            self.adjacency_dict[vertex_to].remove(vertex_from)
+            self.incoming_dict[vertex_to].remove(vertex_from)
+            self.incoming_dict[vertex_from].remove(vertex_to)
+
+        self.version += 1
+
+    def neighbours(self, vertex):
+        """
+        Given a vertex, returns a list of vertices reachable from that vertex.
+
+        >>> g = Graph([1,2,3], [(1,2), (1,3)])
+        >>> g.neighbours(1)
+        [2, 3]
+        """
+
+        if vertex not in self.adjacency_dict.keys():
+            raise ValueError("Vertex {} is not in graph".format(vertex))
+
+        return list(self.adjacency_dict[vertex]) 
+
+    def adjacent(self, vertex):
+        """
+        Returns the set of vertices joined to a vertex by an edge going
+        either way.
+
+        >>> g = Graph([1,2,3], [(1,2), (3,1)])
+        >>> g.adjacent(1) == {2, 3}
+        True
+        """
+
+        return self.adjacency_dict[vertex] | self.incoming_dict[vertex]
+
+    def _search(self, start, labels, predicate, depth_first, undirected):
+        """
+        Searches the graph from start, only entering vertices with the same
+        label as start (if labels are given) which satisfy the predicate (if
+        one is given), following edges backwards too if undirected. Returns
+        the vertices found in the order found.
+        """
+
+        if start not in self.adjacency_dict:
+            raise ValueError("Vertex {} is not in graph".format(start))
+
+        adjacency_dict = self.adjacency_dict
+        incoming_dict = self.incoming_dict if undirected else {}
+        label = labels[start] if labels is not None else None
+
+        found = [start]
+        seen = {start}
+        to_visit = deque(found)
+
+        # Popping from the right makes this a depth first search, and
+        # popping from the left a breadth first search.
+        pop = to_visit.pop if depth_first else to_visit.popleft
+
+        while to_visit:
+            vertex = pop()
+
+            for neighbor in chain(adjacency_dict[vertex],
+                                  incoming_dict.get(vertex, ())):
+                if neighbor in seen:
+                    continue
+
+                if labels is not None and labels[neighbor] != label:
+                    continue
+
+                if predicate is not None and not predicate(neighbor):
+                    continue
+
+                seen.add(neighbor)
+                found.append(neighbor)
+                to_visit.append(neighbor)
+
+        return found
+
+    def breadth_first_search(self, start, labels = None, predicate = None,
+                             undirected = False):
+        """
+        Returns the vertices reachable from start, in the order a breadth first
+        search finds them. If labels (a dictionary from vertices to anything)
+        are given, the search only passes through vertices with the same label
+        as start, and if a predicate is given, only through vertices for which
+        it is true. If undirected, edges are followed either way.
+
+        >>> g = Graph([1,2,3,4], [(1,2), (1,3), (3,4)])
+        >>> g.breadth_first_search(1)
+        [1, 2, 3, 4]
+        >>> g.breadth_first_search(1, {1: "a", 2: "b", 3: "a", 4: "a"})
+        [1, 3, 4]
+        >>> g.breadth_first_search(1, predicate = lambda x: x != 3)
+        [1, 2]
+        """
+
+        return self._search(start, labels, predicate, False, undirected)
+
+    def depth_first_search(self, start, labels = None, predicate = None,
+                           undirected = False):
+        """
+        Returns the vertices reachable from start, in the order a depth first
+        search finds them, restricted by labels and a predicate just like
+        breadth_first_search.
+
+        >>> g = Graph([1,2,3], [(1,2), (2,3)])
+        >>> g.depth_first_search(1)
+        [1, 2, 3]
+        >>> g.depth_first_search(3)
+        [3]
+        >>> g.depth_first_search(3, undirected = True)
+        [3, 2, 1]
+        """
+
+        return self._search(start, labels, predicate, True, undirected)
+
+    def neighbourhood(self, vertices, radius, undirected = False):
+        """
+        Returns the set of vertices at most radius edges away from any of the
+        given vertices, following edges either way if undirected.
+
+        >>> g = Graph([1,2,3,4], [(1,2), (2,3), (3,4)])
+        >>> g.neighbourhood([1], 2) == {1, 2, 3}
+        True
+        >>> g.neighbourhood([1, 4], 0) == {1, 4}
+        True
+        >>> g.neighbourhood([4], 2, True) == {2, 3, 4}
+        True
+        """
+
+        adjacency_dict = self.adjacency_dict
+        incoming_dict = self.incoming_dict if undirected else {}
+
+        found = set(vertices)
+        frontier = list(found)
+
+        for i in range(radius):
+            next_frontier = []
+
+            for vertex in frontier:
+                for neighbor in chain(adjacency_dict[vertex],
+                                      incoming_dict.get(vertex, ())):
+                    if neighbor not in found:
+                        found.add(neighbor)
+                        next_frontier.append(neighbor)
+
+            frontier = next_frontier
+
+        return found
+
+    def distances(self, start):
+        """
+        Returns a dictionary with the least number of edges needed to get from
+        start to each vertex reachable from it.
+
+        >>> g = Graph([1,2,3,4], [(1,2), (2,3), (1,3)])
+        >>> g.distances(1)
+        {1: 0, 2: 1, 3: 1}
+        """
+
+        if start not in self.adjacency_dict:
+            raise ValueError("Vertex {} is not in graph".format(start))
+
+        adjacency_dict = self.adjacency_dict
+
+        distances = {start: 0}
+        to_visit = deque([start])
+
+        while to_visit:
+            vertex = to_visit.popleft()
+            distance = distances[vertex] + 1
+
+            for neighbor in adjacency_dict[vertex]:
+                if neighbor not in distances:
+                    distances[neighbor] = distance
+                    to_visit.append(neighbor)
+
+        return distances
+
+    def shortest_path(self, start, end):
+        """
+        Returns a list of vertices making up a path from start to end using the
+        fewest edges, or None if end cannot be reached from start.
+
+        >>> g = Graph([1,2,3,4,5], [(1,2), (2,3), (3,4), (1,3)])
+        >>> g.shortest_path(1, 4)
+        [1, 3, 4]
+        >>> g.shortest_path(4, 1) is None
+        True
+        """
+
+        if start not in self.adjacency_dict:
+            raise ValueError("Vertex {} is not in graph".format(start))
+
+        if end not in self.adjacency_dict:
+            raise ValueError("Vertex {} is not in graph".format(end))
+
+        adjacency_dict = self.adjacency_dict
+
+        # Each vertex found maps to the vertex it was found from.
+        parents = {start: None}
+        to_visit = deque([start])
+
+        while to_visit and end not in parents:
+            vertex = to_visit.popleft()
+
+            for neighbor in adjacency_dict[vertex]:
+                if neighbor not in parents:
+                    parents[neighbor] = vertex
+                    to_visit.append(neighbor)
+
+        if end not in parents:
+            return None
+
+        path = [end]
+
+        while parents[path[-1]] is not None:
+            path.append(parents[path[-1]])
+
+        path.reverse()
+        return path
+
+    def connected_components(self, labels = None):
+        """
+        Splits the graph into connected components, ignoring the direction of
+        edges, using a union find structure. If labels (a dictionary from
+        vertices to anything) are given, only edges between vertices with the
+        same label join components. Components are returned as a list of sets,
+        in the order their first vertices were added to the graph.
+
+        >>> g = Graph([1,2,3,4,5], [(1,2), (3,2), (4,5)])
+        >>> g.connected_components()
+        [{1, 2, 3}, {4, 5}]
+        >>> g.connected_components({1: 0, 2: 0, 3: 1, 4: 1, 5: 1})
+        [{1, 2}, {3}, {4, 5}]
+        """
+
+        adjacency_dict = self.adjacency_dict
+        parent = {vertex: vertex for vertex in adjacency_dict}
+
+        def find(vertex):
+            # Path halving keeps the trees shallow without recursion.
+            while parent[vertex] != vertex:
+                parent[vertex] = parent[parent[vertex]]
+                vertex = parent[vertex]
+
+            return vertex
+
+        for vertex_from, neighbors in adjacency_dict.items():
+            label = labels[vertex_from] if labels is not None else None
+
+            for vertex_to in neighbors:
+                if labels is not None and labels[vertex_to] != label:
+                    continue
+
+                root_from = find(vertex_from)
+                root_to = find(vertex_to)
+
+                if root_from != root_to:
+                    parent[root_to] = root_from
+
+        components = {}
+
+        for vertex in adjacency_dict:
+            root = find(vertex)
+
+            if root not in components:
+                components[root] = set()
+
+            components[root].add(vertex)
+
+        return list(components.values())
@@ -0,0 +1,673 @@
+# Thanks to this great article on 'Force Directed Graphs' for giving a simple method
+# to distribute the graph
+#      http://cs.brown.edu/~rt/gdhandbook/chapters/force-directed.pdf
+
+import random
+
+from random import randint
+from math import inf, log, sqrt
+from collections import defaultdict
+from .colorgraph import ColorGraphObserver
+from .display import DisplayState, vertex_size
+from .parallel import ParallelForces
+from .vector import Vector
+
+# Coarsening stops once a graph has this few vertices, or once matching
+# edges shrinks it by less than MIN_SHRINK.
+COARSEST_SIZE = 8
+MIN_SHRINK = 0.95
+
+# Natural edge lengths shrink by this factor from one level to the next
+# finer one, as in Walshaw's multilevel force directed placement.
+LEVEL_SCALE = sqrt(4/7)
+
+# Force passes made on the coarsest graph, and on every finer level.
+COARSEST_PASSES = 50
+REFINEMENT_PASSES = 5
+
+# After a move, vertices this many edges from a changed vertex are relaxed
+# with this many force passes, and everything further away stays put.
+RELAX_RADIUS = 2
+RELAX_PASSES = 10
+
+# Levels of the multilevel layout with at least this many vertices are
+# refined by a pool of worker processes, when more than one is asked for.
+PARALLEL_SIZE = 20000
+
+def in_range(vector_1, vector_1_radius, vector_2, vector_2_radius):
+    """
+    Given two vectors, which we can see as circles/spheres/hypermegaspheres
+    if given a radius, this function tests whether the two vectors with
+    these radii overlap given a position and size.
+
+    >>> a = Vector(0, 0)
+    >>> in_range(a, 0.1, a, 0.1)
+    True
+    >>> b = Vector(10,0)
+    >>> in_range(a, 10, b, 10)
+    True
+    >>> in_range(a, 4, b, 4)
+    False
+    """
+
+    space_between_vectors = (vector_1 - vector_2).norm()
+    combined_radii = vector_1_radius + vector_2_radius
+
+    return space_between_vectors < combined_radii
+
+def undirected_adjacency(adjacency_dict):
+    """
+    Returns a copy of an adjacency dictionary with every edge going both ways.
+
+    >>> undirected_adjacency({1: {2}, 2: set()})
+    {1: {2}, 2: {1}}
+    """
+
+    adjacency = {vertex: set(neighbors)
+                 for vertex, neighbors in adjacency_dict.items()}
+
+    for vertex, neighbors in adjacency_dict.items():
+        for neighbor in neighbors:
+            adjacency[neighbor].add(vertex)
+
+    return adjacency
+
+def coarsen(adjacency, rng):
+    """
+    Contracts a random maximal matching of an undirected graph, each vertex
+    being matched to its unmatched neighbour of least degree. Returns the
+    contracted graph, whose vertices are numbered from 0, and a dictionary
+    from each vertex to the vertex it was contracted into.
+
+    >>> coarse, parent = coarsen({1: {2}, 2: {1, 3}, 3: {2, 4}, 4: {3}}, \
+                                 random.Random(0))
+    >>> len(coarse)
+    2
+    >>> parent[1] == parent[2] and parent[3] == parent[4]
+    True
+    """
+
+    order = list(adjacency)
+    rng.shuffle(order)
+
+    parent = {}
+    coarse_count = 0
+
+    for vertex in order:
+        if vertex in parent:
+            continue
+
+        partner = None
+
+        for neighbor in adjacency[vertex]:
+            if neighbor not in parent and neighbor != vertex and \
+                    (partner is None or
+                     len(adjacency[neighbor]) < len(adjacency[partner])):
+                partner = neighbor
+
+        parent[vertex] = coarse_count
+
+        if partner is not None:
+            parent[partner] = coarse_count
+
+        coarse_count += 1
+
+    coarse = {coarse_vertex: set() for coarse_vertex in range(coarse_count)}
+
+    for vertex, neighbors in adjacency.items():
+        coarse_vertex = parent[vertex]
+
+        for neighbor in neighbors:
+            if parent[neighbor] != coarse_vertex:
+                coarse[coarse_vertex].add(parent[neighbor])
+
+    return coarse, parent
+
+def force_pass(adjacency, x, y, k, temperature, moving = None,
+               gravity = 0.01):
+    """
+    Moves every vertex once by the Fruchterman-Reingold forces on it, for
+    natural edge length k, moving no vertex further than temperature. Only
+    vertices within 2k of each other repel, found through a grid of cells
+    2k wide, so a pass takes time linear in the size of the graph.
+
+    If moving is given, only those vertices move, and every other vertex
+    with a position in x and y stays where it is while still pushing and
+    pulling on the ones that move.
+    """
+
+    cell = 2*k
+    cell_squared = cell*cell
+    k_squared = k*k
+
+    grid = defaultdict(list)
+
+    for vertex in x:
+        grid[(int(x[vertex]//cell), int(y[vertex]//cell))].append(vertex)
+
+    if moving is None:
+        moving = adjacency
+
+    for vertex in moving:
+        neighbors = adjacency[vertex]
+        x_vertex, y_vertex = x[vertex], y[vertex]
+        cell_x, cell_y = int(x_vertex//cell), int(y_vertex//cell)
+
+        x_force = y_force = 0.0
+
+        # Repulsion from nearby vertices
+        for i in (cell_x - 1, cell_x, cell_x + 1):
+            for j in (cell_y - 1, cell_y, cell_y + 1):
+                for other in grid.get((i, j), ()):
+                    x_distance = x_vertex - x[other]
+                    y_distance = y_vertex - y[other]
+                    squared = x_distance*x_distance + y_distance*y_distance
+
+                    if 0 < squared < cell_squared:
+                        x_force += x_distance*k_squared/squared
+                        y_force += y_distance*k_squared/squared
+
+        # Attraction along edges
+        for neighbor in neighbors:
+            x_distance = x_vertex - x[neighbor]
+            y_distance = y_vertex - y[neighbor]
+            distance = sqrt(x_distance*x_distance + y_distance*y_distance)
+
+            x_force -= x_distance*distance/k
+            y_force -= y_distance*distance/k
+
+        # A little gravity keeps separate components from drifting apart.
+        x_force -= x_vertex*gravity
+        y_force -= y_vertex*gravity
+
+        force = sqrt(x_force*x_force + y_force*y_force)
+
+        if force > 0:
+            scale = min(force, temperature)/force
+            x[vertex] = x_vertex + x_force*scale
+            y[vertex] = y_vertex + y_force*scale
+
+def centre(x, y):
+    """
+    Moves a layout so that the mean of its coordinates is at the origin.
+
+    >>> x, y = {1: 1.0, 2: 3.0}, {1: 5.0, 2: 5.0}
+    >>> centre(x, y)
+    >>> x, y
+    ({1: -1.0, 2: 1.0}, {1: 0.0, 2: 0.0})
+    """
+
+    mean_x = sum(x.values())/len(x)
+    mean_y = sum(y.values())/len(y)
+
+    for vertex in x:
+        x[vertex] -= mean_x
+        y[vertex] -= mean_y
+
+def multilevel_positions(adjacency, rng, passes = REFINEMENT_PASSES,
+                         workers = 1):
+    """
+    Lays out an undirected graph with natural edge length 1, by coarsening it
+    repeatedly, laying out the coarsest graph, then placing each finer level
+    where the vertices it was contracted into were and refining it with a few
+    force passes. Returns dictionaries of x and y coordinates, centred on
+    the origin.
+
+    Levels of at least PARALLEL_SIZE vertices are refined by the given number
+    of worker processes, or one for each CPU if workers is None.
+
+    >>> adjacency = {i: {j for j in (i - 1, i + 1) if 0 <= j < 20} \
+                     for i in range(20)}
+    >>> x, y = multilevel_positions(adjacency, random.Random(0))
+    >>> sorted(x) == list(range(20))
+    True
+    >>> abs(sum(x.values())) < 1e-9 and abs(sum(y.values())) < 1e-9
+    True
+    """
+
+    levels = [adjacency]
+    parents = []
+
+    while len(levels[-1]) > COARSEST_SIZE:
+        coarse, parent = coarsen(levels[-1], rng)
+
+        if len(coarse) > MIN_SHRINK*len(levels[-1]):
+            break
+
+        levels.append(coarse)
+        parents.append(parent)
+
+    k = LEVEL_SCALE**-(len(levels) - 1)
+
+    coarsest = levels[-1]
+    spread = k*sqrt(len(coarsest))
+    x = {vertex: rng.uniform(-spread, spread) for vertex in coarsest}
+    y = {vertex: rng.uniform(-spread, spread) for vertex in coarsest}
+
+    # The passes push the whole layout around as well as shaping it, so it
+    # is brought back to the origin after every one of them.
+    for i in range(COARSEST_PASSES):
+        force_pass(coarsest, x, y, k, k*(1 - i/COARSEST_PASSES) + 0.1*k)
+        centre(x, y)
+
+    for level in range(len(parents) - 1, -1, -1):
+        parent = parents[level]
+        fine = levels[level]
+        k *= LEVEL_SCALE
+
+        # Vertices start where the vertex they were contracted into was,
+        # nudged apart so matched pairs do not sit on top of each other.
+        x = {vertex: x[parent[vertex]] + rng.uniform(-0.1, 0.1)*k
+             for vertex in fine}
+        y = {vertex: y[parent[vertex]] + rng.uniform(-0.1, 0.1)*k
+             for vertex in fine}
+
+        if workers != 1 and len(fine) >= PARALLEL_SIZE:
+            with ParallelForces(fine, x, y, workers) as forces:
+                for i in range(passes):
+                    forces.step(k, k*(1 - i/passes) + 0.1*k)
+
+                x, y = forces.positions()
+        else:
+            for i in range(passes):
+                force_pass(fine, x, y, k, k*(1 - i/passes) + 0.1*k)
+
+        centre(x, y)
+
+    return x, y
+
+class Layout(ColorGraphObserver):
+    """
+    Keeps track of where every vertex of a ColorGraph is on the map, how big
+    it is and what colour it is drawn, in a DisplayState, and moves the
+    vertices around with a force directed layout. Added to a ColorGraph's
+    observers, it follows the colours of the vertices, and notes which
+    vertices a move changed, so that only the area around them needs
+    relaxing afterwards.
+
+    >>> from matchgraph.colorgraph import ColorGraph
+    >>> c = ColorGraph([(1,"RED"), (2,"BLUE"), (3,"RED")], \
+                       [(1,2), (2,1), (2,3), (3,2)])
+    >>> layout = Layout(1200, 1000)
+    >>> layout.place_new_vertices(c)
+    >>> sorted(layout.state)
+    [1, 2, 3]
+    >>> layout.selected_vertex(layout.state.position(2))
+    2
+    >>> layout.gravitate_nodes(c, 5)
+    """
+
+    def __init__(self, screen_width, screen_height, placement = "random",
+                 workers = 1, cache = None):
+        """
+        Creates an empty layout for a screen of the given size. Vertices are
+        first placed at random ("random"), or all at once with a multilevel
+        force directed layout ("multilevel"), which starts them off much
+        closer to where they settle. The multilevel layout of a very large
+        board is spread over the given number of processes, or over every
+        CPU if workers is None. Given a LayoutCache, boards laid out before
+        are placed from the cache instead.
+        """
+
+        if placement not in ("random", "multilevel"):
+            raise ValueError("Unknown placement {}".format(placement))
+
+        self.placement = placement
+        self.workers = workers
+        self.cache = cache
+        self.screen_width = screen_width
+        self.screen_height = screen_height
+        self.screen_center = Vector(screen_width//2, screen_height//2)
+
+        # Position, velocity, pixel radius and colour of every placed vertex
+        self.state = DisplayState()
+
+        # Vertices whose neighbours have changed since the layout was last
+        # relaxed around them.
+        self.changed = set()
+
+    def vertex_added(self, vertex, color):
+        self.changed.add(vertex)
+
+    def vertex_removed(self, vertex, neighbors):
+        self.changed.discard(vertex)
+        self.changed.update(neighbors)
+
+    def edge_added(self, vertex_from, vertex_to):
+        self.changed.add(vertex_from)
+        self.changed.add(vertex_to)
+
+    def color_changed(self, vertex, color):
+        self.state.set_color(vertex, color)
+
+    def colors_swapped(self, vertex_1, vertex_2):
+        self.state.swap_colors(vertex_1, vertex_2)
+
+    def random_coord(self, vertex):
+        """
+        Returns a random coordinate within 10
+        screen lengths from the centre of the map.
+        """
+
+        x_coordinate = randint(-10*self.screen_width, 10*self.screen_width)
+        y_coordinate = randint(-10*self.screen_height, 10*self.screen_height)
+
+        return Vector(x_coordinate, y_coordinate)
+
+    def get_new_coordinate(self, vertex):
+        """
+        Returns a new coordinate vector, randomly placed on the map
+        and tested to ensure it does not overlap with another vertex.
+        """
+
+        size = vertex_size(vertex)
+
+        while True:
+            new_coordinate = self.random_coord(vertex)
+
+            if self.state.vertex_at(new_coordinate[0], new_coordinate[1],
+                                    size) is None:
+                return new_coordinate
+
+    def place_new_vertices(self, graph):
+        """ Gives a coordinate to every vertex of the graph without one. """
+
+        state = self.state
+
+        if state:
+            placed = None
+        elif self.cache is not None and self.place_cached(graph):
+            placed = "cache"
+        elif self.placement == "multilevel":
+            self.place_multilevel(graph)
+            placed = "multilevel"
+        else:
+            placed = None
+
+        for vertex in graph.graph.vertices():
+            if vertex not in state:
+                x, y = self.get_new_coordinate(vertex)
+                state.add(vertex, x, y, graph.get_color(vertex))
+
+        if placed == "multilevel" and self.cache is not None:
+            self.store_cached(graph)
+
+    def place_cached(self, graph):
+        """
+        Places the vertices of the graph where the layout cache has them,
+        returning whether it had any. If only some of the vertices were
+        cached, the rest start next to their placed neighbours and the area
+        around them is relaxed, and the finished layout is cached in turn.
+
+        >>> import tempfile
+        >>> from matchgraph.boards import make_board
+        >>> from matchgraph.layoutcache import LayoutCache
+        >>> directory = tempfile.TemporaryDirectory()
+        >>> board = make_board("grid", 100, seed = 1)
+        >>> layout = Layout(1200, 1000, "multilevel", \
+                            cache = LayoutCache(directory.name))
+        >>> layout.place_new_vertices(board)
+        >>> settled = layout.state.positions()
+        >>> layout.clear()
+        >>> layout.place_cached(board)
+        True
+        >>> settled == layout.state.positions()
+        True
+        >>> directory.cleanup()
+        """
+
+        positions = self.cache.load(graph, vertex_size)
+
+        if not positions:
+            return False
+
+        state = self.state
+
+        for vertex, (x, y) in positions.items():
+            state.add(vertex, x, y, graph.get_color(vertex))
+
+        missing = [vertex for vertex in graph.graph.vertices()
+                   if vertex not in state]
+
+        if missing:
+            adjacency_dict = graph.graph.adjacency_dict
+
+            for vertex in missing:
+                placed = [state.position(neighbor)
+                          for neighbor in adjacency_dict[vertex]
+                          if neighbor in positions]
+
+                if placed:
+                    center = sum(placed, Vector(0, 0))/len(placed) + \
+                        Vector(randint(-10, 10), randint(-10, 10))
+                else:
+                    center = self.get_new_coordinate(vertex)
+
+                state.add(vertex, center[0], center[1], graph.get_color(vertex))
+
+            self.relax_around(graph, missing)
+            self.store_cached(graph)
+
+        return True
+
+    def store_cached(self, graph):
+        """ Saves where the vertices of the graph are in the layout cache. """
+
+        self.cache.store(graph, self.state.positions(), vertex_size)
+
+    def place_multilevel(self, graph, passes = REFINEMENT_PASSES, seed = None):
+        """
+        Places every vertex of the graph with a multilevel force directed
+        layout, centred on the screen, with edges about four vertex radii
+        long. Boards too big for the screen at that length are shrunk to fit,
+        though never so far that edges are shorter than a vertex is wide;
+        Renderer.fit zooms out to show the rest.
+
+        >>> from matchgraph.boards import make_board
+        >>> board = make_board("grid", 100, seed = 1)
+        >>> layout = Layout(1200, 1000, "multilevel")
+        >>> layout.place_new_vertices(board)
+        >>> len(layout.state)
+        100
+        >>> round(sum(layout.state.x)/100), round(sum(layout.state.y)/100)
+        (600, 500)
+        """
+
+        if not graph.graph.adjacency_dict:
+            return
+
+        adjacency = undirected_adjacency(graph.graph.adjacency_dict)
+        x, y = multilevel_positions(adjacency, random.Random(seed), passes,
+                                    self.workers)
+
+        radius = sum(map(vertex_size, adjacency))/len(adjacency)
+        width = max(x.values()) - min(x.values())
+        height = max(y.values()) - min(y.values())
+
+        # Leave a vertex's width free around the edges of the screen.
+        fit = min((self.screen_width - 2*radius)/width if width else inf,
+                  (self.screen_height - 2*radius)/height if height else inf)
+        edge_length = max(min(4*radius, fit), 2*radius)
+
+        center_x, center_y = self.screen_center
+
+        for vertex in adjacency:
+            self.state.add(vertex, center_x + x[vertex]*edge_length,
+                           center_y + y[vertex]*edge_length,
+                           graph.get_color(vertex))
+
+    def bounds(self):
+        """
+        Returns the smallest and largest x and y coordinates covered by any
+        vertex, as (left, top, right, bottom), or None if there are none.
+        """
+
+        state = self.state
+
+        if not state:
+            return None
+
+        return (min(x - radius for x, radius in zip(state.x, state.radius)),
+                min(y - radius for y, radius in zip(state.y, state.radius)),
+                max(x + radius for x, radius in zip(state.x, state.radius)),
+                max(y + radius for y, radius in zip(state.y, state.radius)))
+
+    def gravitate_nodes(self, graph, cycles):
+        """
+        Moves every vertex by the forces acting on it, the given number of
+        times. Edges pull their vertices together, vertices push each other
+        apart, and everything is pulled towards the centre of the screen.
+        """
+
+        state = self.state
+        xs, ys, vxs, vys, sizes = state.x, state.y, state.vx, state.vy, \
+                                  state.radius
+        number = state.number
+        adjacency_dict = graph.graph.adjacency_dict
+        center_x, center_y = self.screen_center
+        count = len(state)
+
+        for cycle in range(cycles):
+            for i in range(count):
+                x, y = xs[i], ys[i]
+                x_force = y_force = 0
+
+                # Edge Spring Force
+                for neighbor in adjacency_dict[state.vertices[i]]:
+                    j = number[neighbor]
+                    x_distance = xs[j] - x
+                    y_distance = ys[j] - y
+
+                    x_force += sizes[j]/10*log(x_distance) if x_distance > 0 else 1
+                    y_force += sizes[j]/10*log(y_distance) if y_distance > 0 else 1
+
+                # Repulsive Force
+                for j in range(count):
+                    if j == i:
+                        continue
+
+                    x_distance = xs[j] - x
+                    y_distance = ys[j] - y
+
+                    x_negative = 1 if x_distance < 0 else -1
+                    y_negative = 1 if y_distance < 0 else -1
+
+                    x_force += x_negative/(x_distance/300000)**2/sizes[j] if x_distance else 1
+                    y_force += y_negative/(y_distance/300000)**2/sizes[i] if y_distance else 1
+
+                # Attaction to Center
+                x_distance = x - center_x
+                y_distance = y - center_y
+
+                x_force += -75*log(x_distance) if x_distance > 0 else 1
+                y_force += -75*log(y_distance) if y_distance > 0 else 1
+
+                vxs[i] = x_force*10/sizes[i]
+                vys[i] = y_force*10/sizes[i]
+                xs[i] = x + vxs[i]
+                ys[i] = y + vys[i]
+
+    def relax_around(self, graph, vertices, radius = RELAX_RADIUS,
+                     passes = RELAX_PASSES):
+        """
+        Relaxes the layout near the given vertices with a few force passes,
+        moving only the vertices at most radius edges from them. The vertices
+        one edge further out are held where they are, so the area moved
+        settles against the rest of the board, and the work done depends on
+        the size of that area rather than on the size of the board.
+
+        >>> from matchgraph.boards import make_board
+        >>> board = make_board("grid", 100, seed = 1)
+        >>> layout = Layout(1200, 1000, "multilevel")
+        >>> layout.place_new_vertices(board)
+        >>> before = layout.state.positions()
+        >>> layout.relax_around(board, [1], 1)
+        >>> after = layout.state.positions()
+        >>> moved = {vertex for vertex in before \
+                     if after[vertex] != before[vertex]}
+        >>> moved <= board.graph.neighbourhood([1], 1, True)
+        True
+
+        Edges going either way count, so a vertex with only edges into it
+        settles against the vertices they come from.
+
+        >>> from matchgraph.colorgraph import ColorGraph
+        >>> board = ColorGraph([(v, "RED") for v in range(5)], \
+                               [(1, 0), (2, 0), (3, 0), (4, 3)])
+        >>> layout = Layout(1200, 1000, "multilevel")
+        >>> layout.place_new_vertices(board)
+        >>> before = layout.state.positions()
+        >>> layout.relax_around(board, [0], 1)
+        >>> after = layout.state.positions()
+        >>> sorted(vertex for vertex in before \
+                   if after[vertex] != before[vertex])
+        [0, 1, 2, 3]
+        """
+
+        state = self.state
+        number = state.number
+        adjacency_dict = graph.graph.adjacency_dict
+
+        vertices = [vertex for vertex in vertices
+                    if vertex in adjacency_dict and vertex in number]
+
+        if not vertices:
+            return
+
+        region = graph.graph.neighbourhood(vertices, radius, True)
+        surrounding = graph.graph.neighbourhood(region, 1, True)
+
+        moving = [vertex for vertex in region if vertex in number]
+        x = {vertex: state.x[number[vertex]] for vertex in surrounding
+             if vertex in number}
+        y = {vertex: state.y[number[vertex]] for vertex in x}
+
+        # Vertices with no place yet have nothing to settle against.
+        adjacency = {vertex: [neighbor for neighbor
+                              in graph.graph.adjacent(vertex) if neighbor in x]
+                     for vertex in moving}
+
+        k = 4*sum(state.radius[number[vertex]] for vertex in moving)/len(moving)
+
+        for i in range(passes):
+            force_pass(adjacency, x, y, k, 0.5*k*(1 - i/passes) + 0.05*k,
+                       moving, 0)
+
+        for vertex in moving:
+            state.move(vertex, x[vertex], y[vertex])
+
+    def relax_changes(self, graph, radius = RELAX_RADIUS,
+                      passes = RELAX_PASSES):
+        """
+        Relaxes the layout around every vertex changed since the last time,
+        which after a swap are the swapped vertices and the neighbours of the
+        vertices it removed, now joined by new edges.
+        """
+
+        if self.changed:
+            changed = self.changed
+            self.changed = set()
+            self.relax_around(graph, changed, radius, passes)
+
+    def selected_vertex(self, position):
+        """ Returns the vertex drawn at the given position, if there is one. """
+
+        return self.state.vertex_at(position[0], position[1], 5)
+
+    def swap_vertices(self, vertex_1, vertex_2):
+        """ Swaps the places of two vertices. """
+
+        self.state.swap_positions(vertex_1, vertex_2)
+
+        self.changed.add(vertex_1)
+        self.changed.add(vertex_2)
+
+    def remove_vertex(self, vertex):
+        self.state.remove(vertex)
+        self.changed.discard(vertex)
+
+    def clear(self):
+        """ Forgets every vertex, so that they are all placed again. """
+
+        self.state.clear()
+        self.changed.clear()
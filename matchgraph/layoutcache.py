@@ -0,0 +1,275 @@
+"""
+layoutcache.py
+
+Keeps the settled layouts of boards on disk, so that a board seen before is
+shown settled straight away instead of being laid out again. Each layout is
+a file named after a hash of the board's structure and vertex sizes, holding
+a signature and a position for every vertex. A vertex's signature hashes its
+name, size and neighbours, so a board which differs a little from a cached
+one can still reuse the positions of the vertices which did not change.
+Files are read through mmap, and the least recently used ones are deleted
+once the cache grows past its size limit.
+"""
+
+import hashlib
+import mmap
+import os
+import struct
+
+MAGIC = b"MGLAY\x01"
+HEADER = struct.Struct("<6sQ")
+RECORD = struct.Struct("<Qdd")
+
+SUFFIX = ".layout"
+
+# The cache is trimmed back below this many bytes whenever a layout is stored.
+MAX_BYTES = 64*2**20
+
+# On a miss, this many of the most recently used layouts are searched for
+# vertices to reuse, and one is only used if it places at least MIN_REUSE of
+# the board's vertices.
+PARTIAL_CANDIDATES = 8
+MIN_REUSE = 0.5
+
+def default_directory():
+    """ Returns the directory layouts are cached in unless told otherwise. """
+
+    cache_home = os.environ.get("XDG_CACHE_HOME",
+                                os.path.join(os.path.expanduser("~"), ".cache"))
+
+    return os.path.join(cache_home, "matchgraph", "layouts")
+
+def vertex_signatures(graph, vertex_size):
+    """
+    Returns a dictionary from every vertex of a ColorGraph to a 64 bit hash
+    of its name, its size as given by the function vertex_size, and the
+    names of its neighbours.
+
+    >>> from matchgraph.colorgraph import ColorGraph
+    >>> c = ColorGraph([(1,"RED"), (2,"BLUE"), (3,"RED")], \
+                       [(1,2), (2,1), (2,3), (3,2)])
+    >>> signatures = vertex_signatures(c, lambda vertex: 100)
+    >>> signatures[1] == signatures[3]
+    False
+    >>> signatures == vertex_signatures(c, lambda vertex: 100)
+    True
+    """
+
+    signatures = {}
+
+    for vertex, neighbors in graph.graph.adjacency_dict.items():
+        text = "{!r}:{!r}:{}".format(vertex, vertex_size(vertex),
+                                     ",".join(sorted(map(repr, neighbors))))
+        digest = hashlib.blake2b(text.encode(), digest_size = 8).digest()
+        signatures[vertex] = int.from_bytes(digest, "little")
+
+    return signatures
+
+def board_key(signatures):
+    """
+    Returns a hash of a whole board from the signatures of its vertices,
+    which does not depend on the order the vertices were added in.
+    """
+
+    digest = hashlib.blake2b(digest_size = 16)
+
+    for signature in sorted(signatures.values()):
+        digest.update(signature.to_bytes(8, "little"))
+
+    return digest.hexdigest()
+
+class LayoutCache():
+    """
+    A directory of cached layouts.
+
+    >>> import tempfile
+    >>> from matchgraph.colorgraph import ColorGraph
+    >>> c = ColorGraph([(1,"RED"), (2,"BLUE"), (3,"RED")], \
+                       [(1,2), (2,1), (2,3), (3,2)])
+    >>> sizes = {1: 100, 2: 120, 3: 140, 4: 100}.get
+    >>> directory = tempfile.TemporaryDirectory()
+    >>> cache = LayoutCache(directory.name)
+    >>> cache.load(c, sizes)
+    {}
+    >>> cache.store(c, {1: (0, 0), 2: (1, 0), 3: (2, 0)}, sizes)
+    >>> cache.load(c, sizes)
+    {1: (0.0, 0.0), 2: (1.0, 0.0), 3: (2.0, 0.0)}
+    >>> c.add_vertex(4, "BLUE")
+    >>> c.add_edge(1, 4)
+    >>> cache.load(c, sizes)
+    {2: (1.0, 0.0), 3: (2.0, 0.0)}
+    >>> directory.cleanup()
+    """
+
+    def __init__(self, directory = None, max_bytes = MAX_BYTES):
+        self.directory = directory or default_directory()
+        self.max_bytes = max_bytes
+
+    def path(self, key):
+        return os.path.join(self.directory, key + SUFFIX)
+
+    def entries(self):
+        """
+        Returns the path, size and last use of every cached layout, most
+        recently used first.
+        """
+
+        entries = []
+
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return entries
+
+        for name in names:
+            if name.endswith(SUFFIX):
+                path = os.path.join(self.directory, name)
+
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+
+                entries.append((path, stat.st_size, stat.st_mtime))
+
+        entries.sort(key = lambda entry: entry[2], reverse = True)
+
+        return entries
+
+    def read(self, path, signatures):
+        """
+        Returns the positions a cached layout gives to the vertices with the
+        given signatures, as a dictionary from signature to (x, y).
+        """
+
+        positions = {}
+
+        with open(path, "rb") as layout_file:
+            try:
+                mapped = mmap.mmap(layout_file.fileno(), 0,
+                                   access = mmap.ACCESS_READ)
+            except ValueError:
+                # Empty files cannot be mapped.
+                return positions
+
+        with mapped, memoryview(mapped) as view:
+            if len(view) < HEADER.size:
+                return positions
+
+            magic, count = HEADER.unpack_from(view)
+
+            if magic != MAGIC or len(view) != HEADER.size + count*RECORD.size:
+                return positions
+
+            for signature, x, y in RECORD.iter_unpack(view[HEADER.size:]):
+                if signature in signatures:
+                    positions[signature] = (x, y)
+
+        return positions
+
+    def load(self, graph, vertex_size):
+        """
+        Returns a dictionary from vertices of the board to their cached
+        positions. This is every vertex if the board itself was cached, the
+        vertices which did not change if a board much like it was, and
+        nothing otherwise.
+        """
+
+        signatures = vertex_signatures(graph, vertex_size)
+
+        if not signatures:
+            return {}
+
+        vertices = {signature: vertex for vertex, signature in signatures.items()}
+        path = self.path(board_key(signatures))
+
+        if os.path.exists(path):
+            candidates = [path]
+        else:
+            candidates = [entry[0] for entry
+                          in self.entries()[:PARTIAL_CANDIDATES]]
+
+        best = {}
+
+        for candidate in candidates:
+            try:
+                positions = self.read(candidate, vertices)
+            except FileNotFoundError:
+                continue
+
+            if len(positions) > len(best):
+                best = positions
+                best_path = candidate
+
+        if len(best) < MIN_REUSE*len(signatures):
+            return {}
+
+        # Using a layout makes it the most recently used.
+        try:
+            os.utime(best_path)
+        except FileNotFoundError:
+            pass
+
+        return {vertices[signature]: position
+                for signature, position in best.items()}
+
+    def store(self, graph, positions, vertex_size):
+        """
+        Stores the (x, y) positions of the board's vertices, then deletes the
+        least recently used layouts until the cache is small enough again.
+        """
+
+        signatures = vertex_signatures(graph, vertex_size)
+        records = [(signature,) + tuple(positions[vertex])
+                   for vertex, signature in signatures.items()
+                   if vertex in positions]
+
+        if not records:
+            return
+
+        os.makedirs(self.directory, exist_ok = True)
+
+        path = self.path(board_key(signatures))
+        temporary = "{}.{}.tmp".format(path, os.getpid())
+
+        with open(temporary, "wb") as layout_file:
+            layout_file.write(HEADER.pack(MAGIC, len(records)))
+
+            for record in records:
+                layout_file.write(RECORD.pack(*record))
+
+        os.replace(temporary, path)
+
+        self.evict(keep = path)
+
+    def evict(self, keep = None):
+        """
+        Deletes the least recently used layouts, other than keep, until the
+        cache takes up no more than max_bytes.
+        """
+
+        entries = self.entries()
+        total = sum(size for path, size, used in entries)
+
+        for path, size, used in reversed(entries):
+            if total <= self.max_bytes:
+                break
+
+            if path == keep:
+                continue
+
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+            total -= size
+
+    def clear(self):
+        """ Deletes every cached layout. """
+
+        for path, size, used in self.entries():
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,188 @@
+"""
+moves.py
+
+Keeps count of the legal moves left on a board as the game is played, so a
+deadlocked board is noticed straight away, and reshuffles deadlocked boards.
+"""
+
+import random
+
+from itertools import chain
+from .boards import match_free_colors
+from .colorgraph import ColorGraphObserver
+
+class MoveTracker(ColorGraphObserver):
+    """
+    Watches a ColorGraph and keeps the set of pairs of vertices which can be
+    swapped to make a group of 3. A move only depends on the colours of the
+    vertices within two edges of the pair, so after a change only the moves
+    near the changed vertices are checked again.
+    """
+
+    def __init__(self, colorgraph):
+        """
+        Starts tracking the moves on the given ColorGraph.
+
+        >>> from matchgraph.colorgraph import ColorGraph
+        >>> c = ColorGraph([(1,"RED"), (2,"BLUE"), (3,"RED"), (4,"RED")], \
+                           [(1,2), (2,1), (2,3), (3,2), (3,4), (4,3)])
+        >>> tracker = MoveTracker(c)
+        >>> tracker.available_moves()
+        1
+        >>> c.swap_vertices(1, 2)
+        (3, [2, 3, 4])
+        >>> tracker.is_deadlocked()
+        True
+        """
+
+        self.colorgraph = colorgraph
+        self.moves = set()
+
+        # Vertices which have changed since the moves were last brought
+        # up to date.
+        self.changed = set(colorgraph.graph.adjacency_dict)
+
+        colorgraph.observers.append(self)
+
+    def vertex_added(self, vertex, color):
+        self.changed.add(vertex)
+
+    def vertex_removed(self, vertex, neighbors):
+        self.changed.discard(vertex)
+
+        for neighbor in neighbors:
+            self.moves.discard(frozenset((vertex, neighbor)))
+            self.changed.add(neighbor)
+
+    def edge_added(self, vertex_from, vertex_to):
+        self.changed.add(vertex_from)
+        self.changed.add(vertex_to)
+
+    def color_changed(self, vertex, color):
+        self.changed.add(vertex)
+
+    def colors_swapped(self, vertex_1, vertex_2):
+        self.changed.add(vertex_1)
+        self.changed.add(vertex_2)
+
+    def update(self):
+        """
+        Checks every move within two edges of a changed vertex again.
+        """
+
+        if not self.changed:
+            return
+
+        adjacency_dict = self.colorgraph.graph.adjacency_dict
+        incoming_dict = self.colorgraph.graph.incoming_dict
+        creates_match = self.colorgraph.creates_match
+
+        # Any move whose legality could have changed has an endpoint
+        # within two edges of a changed vertex, counting edges either way
+        # just as groups do.
+        region = self.colorgraph.graph.neighbourhood(self.changed, 2, True)
+
+        for vertex in region:
+            edges = chain(((vertex, neighbor)
+                           for neighbor in adjacency_dict[vertex]),
+                          ((neighbor, vertex)
+                           for neighbor in incoming_dict[vertex]))
+
+            for vertex_from, vertex_to in edges:
+                move = frozenset((vertex_from, vertex_to))
+
+                if creates_match(vertex_from, vertex_to):
+                    self.moves.add(move)
+                else:
+                    self.moves.discard(move)
+
+        self.changed = set()
+
+    def available_moves(self):
+        """ Returns the number of pairs of vertices which can be swapped. """
+
+        self.update()
+        return len(self.moves)
+
+    def is_deadlocked(self):
+        """ Returns true if no swap on the board makes a group of 3. """
+
+        return self.available_moves() == 0
+
+    def get_move(self):
+        """
+        Returns a pair of vertices which can be swapped, or None if there
+        are none, which is handy for giving the player a hint.
+        """
+
+        self.update()
+
+        for move in self.moves:
+            vertex_1, vertex_2 = move
+
+            if self.colorgraph.graph.is_edge(vertex_1, vertex_2):
+                return vertex_1, vertex_2
+
+            return vertex_2, vertex_1
+
+        return None
+
+def reshuffle(colorgraph, seed = None, attempts = 20):
+    """
+    Recolours a board, keeping the number of vertices of each colour, so that
+    no group of 3 is on the board and at least one swap makes one. Raises a
+    ValueError if no such colouring was found in the given number of attempts.
+
+    >>> from matchgraph.boards import playable_board
+    >>> board = playable_board("grid", 100, 3, seed = 4)
+    >>> counts = sorted(board.vertex_colors.values())
+    >>> reshuffle(board, seed = 4)
+    >>> sorted(board.vertex_colors.values()) == counts
+    True
+    >>> max(len(x) for x in board.partition_graph())
+    2
+    >>> MoveTracker(board).is_deadlocked()
+    False
+
+    Edges only going one way still join groups.
+
+    >>> from matchgraph.colorgraph import ColorGraph
+    >>> colors = ["RED", "BLUE", "GREEN"]
+    >>> board = ColorGraph([(v, colors[v % 3]) for v in range(12)],
+    ...                    [(v, (v + 1) % 12) for v in range(12)] +
+    ...                    [(v, (v + 5) % 12) for v in range(12)])
+    >>> reshuffle(board, seed = 1)
+    >>> max(len(x) for x in board.partition_graph())
+    2
+    """
+
+    rng = random.Random(seed)
+
+    colors = sorted(set(colorgraph.vertex_colors.values()))
+    quotas = [0]*len(colors)
+
+    for color in colorgraph.vertex_colors.values():
+        quotas[colors.index(color)] += 1
+
+    for attempt in range(attempts):
+        vertex_colors = match_free_colors(colorgraph.graph, colors,
+                                          rng, quotas)
+
+        if vertex_colors is None:
+            continue
+
+        old_colors = colorgraph.vertex_colors
+        colorgraph.vertex_colors = vertex_colors
+
+        has_move = next(colorgraph.legal_moves(), None) is not None
+        colorgraph.vertex_colors = old_colors
+
+        if has_move:
+            for vertex, color in vertex_colors.items():
+                if old_colors[vertex] != color:
+                    colorgraph.set_color(vertex, color)
+
+            return
+
+    raise ValueError("Could not reshuffle a board of {} vertices"
+                     .format(len(colorgraph.vertex_colors)))
@@ -0,0 +1,266 @@
+"""
+parallel.py
+
+Runs the force passes of layout.py over several processes, for boards too
+big for one Python process to lay out quickly. The vertices are kept in
+order of their x coordinate, and the order is split into strips of equal
+size, one for each worker. Each worker reads the positions of its own strip,
+of the vertices within reach of it on either side and of the ends of its
+edges, so a pass costs each worker time for its strip rather than for the
+whole board. Coordinates and the order live in shared memory. Coordinates
+are kept twice over: every pass reads the positions left by the last pass
+and writes new ones into the other copy, so the workers never see a half
+finished pass. Between passes the order is sorted again by the new
+positions, which moves vertices between strips as they cross, so every
+strip stays the same size. Only the strip bounds and force parameters are
+sent to the workers on each pass, and the only synchronisation is waiting
+for every strip to finish.
+"""
+
+import os
+
+from array import array
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from math import sqrt
+from multiprocessing.shared_memory import SharedMemory
+
+# Each worker's view of the graph and the shared coordinates, set up once
+# when the worker starts.
+_worker = {}
+
+def _attach(name, order_name, count, offsets, targets):
+    """ Opens the shared coordinates and order in a newly started worker. """
+
+    memory = SharedMemory(name)
+    order_memory = SharedMemory(order_name)
+
+    _worker["memory"] = memory
+    _worker["coordinates"] = memory.buf.cast("d")
+    _worker["order_memory"] = order_memory
+    _worker["order"] = order_memory.buf.cast("l")
+    _worker["count"] = count
+    _worker["offsets"] = offsets
+    _worker["targets"] = targets
+
+def _force_strip(start, end, source, k, temperature, gravity):
+    """
+    Makes one force pass over the vertices in places start to end of the
+    order, reading positions from copy source of the coordinates and writing
+    the new ones into the other copy. The forces are those of
+    layout.force_pass.
+    """
+
+    coordinates = _worker["coordinates"]
+    order = _worker["order"]
+    count = _worker["count"]
+    offsets = _worker["offsets"]
+    targets = _worker["targets"]
+
+    read = 2*count*source
+    write = 2*count*(1 - source)
+
+    shared_x = coordinates[read:read + count]
+    shared_y = coordinates[read + count:read + 2*count]
+
+    cell = 2*k
+    cell_squared = cell*cell
+    k_squared = k*k
+
+    strip = order[start:end].tolist()
+
+    # Only vertices within a cell of the strip can push on it, and as the
+    # order is sorted by x they are found by walking out from either end.
+    low = shared_x[strip[0]] - cell
+    high = shared_x[strip[-1]] + cell
+
+    nearby = list(strip)
+    place = start - 1
+
+    while place >= 0 and shared_x[order[place]] >= low:
+        nearby.append(order[place])
+        place -= 1
+
+    place = end
+
+    while place < count and shared_x[order[place]] <= high:
+        nearby.append(order[place])
+        place += 1
+
+    # The nearby positions are read many times over, so they are copied out,
+    # while the far ends of edges are read from the shared coordinates.
+    x = {vertex: shared_x[vertex] for vertex in nearby}
+    y = {vertex: shared_y[vertex] for vertex in nearby}
+
+    grid = defaultdict(list)
+
+    for other in nearby:
+        grid[(int(x[other]//cell), int(y[other]//cell))].append(other)
+
+    new_x = coordinates[write:write + count]
+    new_y = coordinates[write + count:write + 2*count]
+
+    for vertex in strip:
+        x_vertex, y_vertex = x[vertex], y[vertex]
+        cell_x, cell_y = int(x_vertex//cell), int(y_vertex//cell)
+
+        x_force = y_force = 0.0
+
+        # Repulsion from nearby vertices
+        for i in (cell_x - 1, cell_x, cell_x + 1):
+            for j in (cell_y - 1, cell_y, cell_y + 1):
+                for other in grid.get((i, j), ()):
+                    x_distance = x_vertex - x[other]
+                    y_distance = y_vertex - y[other]
+                    squared = x_distance*x_distance + y_distance*y_distance
+
+                    if 0 < squared < cell_squared:
+                        x_force += x_distance*k_squared/squared
+                        y_force += y_distance*k_squared/squared
+
+        # Attraction along edges
+        for index in range(offsets[vertex], offsets[vertex + 1]):
+            neighbor = targets[index]
+            x_distance = x_vertex - shared_x[neighbor]
+            y_distance = y_vertex - shared_y[neighbor]
+            distance = sqrt(x_distance*x_distance + y_distance*y_distance)
+
+            x_force -= x_distance*distance/k
+            y_force -= y_distance*distance/k
+
+        x_force -= x_vertex*gravity
+        y_force -= y_vertex*gravity
+
+        force = sqrt(x_force*x_force + y_force*y_force)
+
+        if force > 0:
+            scale = min(force, temperature)/force
+            x_vertex += x_force*scale
+            y_vertex += y_force*scale
+
+        new_x[vertex] = x_vertex
+        new_y[vertex] = y_vertex
+
+class ParallelForces():
+    """
+    A pool of worker processes making force passes over an undirected graph
+    whose coordinates are kept in shared memory. Use it as a context manager,
+    or call close, so that the workers stop and the shared memory is freed.
+
+    >>> adjacency = {i: {j for j in (i - 1, i + 1) if 0 <= j < 6} \
+                     for i in range(6)}
+    >>> x = {i: float(i) for i in range(6)}
+    >>> y = {i: float(i % 2) for i in range(6)}
+    >>> with ParallelForces(adjacency, x, y, 2) as forces:
+    ...     forces.step(1, 0.5)
+    ...     x, y = forces.positions()
+    >>> sorted(x)
+    [0, 1, 2, 3, 4, 5]
+    >>> [x[forces.vertices[i]] for i in forces.order] == sorted(x.values())
+    True
+    """
+
+    def __init__(self, adjacency, x, y, workers = None):
+        """
+        Copies the graph and its coordinates into shared memory, and starts
+        the given number of workers, or one for each CPU.
+        """
+
+        if not adjacency:
+            raise ValueError("Cannot lay out an empty graph")
+
+        self.vertices = sorted(adjacency, key = x.__getitem__)
+        count = len(self.vertices)
+        number = {vertex: i for i, vertex in enumerate(self.vertices)}
+
+        # The graph in compressed sparse rows: the neighbours of vertex i
+        # are targets[offsets[i]:offsets[i + 1]].
+        offsets = array("l", [0])
+        targets = array("l")
+
+        for vertex in self.vertices:
+            targets.extend(number[neighbor] for neighbor in adjacency[vertex])
+            offsets.append(len(targets))
+
+        self.count = count
+        self.memory = SharedMemory(create = True, size = 4*count*8)
+        self.coordinates = self.memory.buf.cast("d")
+        self.coordinates[:count] = array("d", (x[vertex]
+                                               for vertex in self.vertices))
+        self.coordinates[count:2*count] = array("d", (y[vertex]
+                                                      for vertex in self.vertices))
+        self.source = 0
+
+        # The vertex numbers in order of x, which they start out in.
+        self.order = list(range(count))
+        self.order_memory = SharedMemory(create = True,
+                                         size = count*array("l").itemsize)
+        self.shared_order = self.order_memory.buf.cast("l")
+        self.shared_order[:] = array("l", self.order)
+
+        workers = min(workers or os.cpu_count() or 1, count)
+        self.strips = [(count*i//workers, count*(i + 1)//workers)
+                       for i in range(workers)]
+
+        self.executor = ProcessPoolExecutor(workers, initializer = _attach,
+                                            initargs = (self.memory.name,
+                                                        self.order_memory.name,
+                                                        count, offsets,
+                                                        targets))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception):
+        self.close()
+
+    def step(self, k, temperature, gravity = 0.01):
+        """
+        Makes one force pass over every vertex, for natural edge length k,
+        moving no vertex further than temperature.
+        """
+
+        futures = [self.executor.submit(_force_strip, start, end, self.source,
+                                        k, temperature, gravity)
+                   for start, end in self.strips]
+
+        for future in futures:
+            future.result()
+
+        self.source = 1 - self.source
+
+        # No vertex moves far in one pass, so the order is nearly sorted
+        # already, which sorting takes about linear time for.
+        read = 2*self.count*self.source
+        x = self.coordinates[read:read + self.count]
+        self.order.sort(key = x.__getitem__)
+        self.shared_order[:] = array("l", self.order)
+        x.release()
+
+    def positions(self):
+        """ Returns dictionaries of the current x and y coordinates. """
+
+        count = self.count
+        read = 2*count*self.source
+
+        x = self.coordinates[read:read + count].tolist()
+        y = self.coordinates[read + count:read + 2*count].tolist()
+
+        return dict(zip(self.vertices, x)), dict(zip(self.vertices, y))
+
+    def close(self):
+        """ Stops the workers and frees the shared memory. """
+
+        if self.executor is None:
+            return
+
+        self.executor.shutdown()
+        self.executor = None
+
+        self.coordinates.release()
+        self.memory.close()
+        self.memory.unlink()
+
+        self.shared_order.release()
+        self.order_memory.close()
+        self.order_memory.unlink()
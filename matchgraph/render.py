@@ -0,0 +1,232 @@
+"""
+render.py
+
+Draws a ColorGraph and its Layout with pygame. pygame is only imported once
+a Renderer is made, so the rest of the package can be used without it.
+"""
+
+from colorsys import hsv_to_rgb
+from zlib import crc32
+from .vector import Vector
+
+# Dictionary containing the RGB values for Colours
+COLOURS = {"RED":(255, 0, 0), "GREEN":(0, 255, 0),
+        "BLUE":(0, 0, 255), "YELLOW":(255, 255, 0),
+        "PURPLE":(76, 0, 153), "BLACK":(0, 0, 0),
+        "WHITE":(255,255,255)}
+
+def rgb(color):
+    """
+    Returns the RGB value of a colour. Colours not in COLOURS, like those
+    boards with many colours make up, get a bright RGB value worked out from
+    their name, so they are drawn the same way every time.
+
+    >>> rgb("RED")
+    (255, 0, 0)
+    >>> rgb("COLOR_6") == rgb("COLOR_6") != rgb("COLOR_7")
+    True
+    """
+
+    if color in COLOURS:
+        return COLOURS[color]
+
+    hue = crc32(str(color).encode())/2**32
+
+    return tuple(int(255*value) for value in hsv_to_rgb(hue, 0.8, 1))
+
+# Vertex radii are rounded to a multiple of this many map pixels before
+# being magnified, so each zoom level only ever needs a few sprites.
+SPRITE_BUCKET = 4
+
+# Circles drawn bigger than this many pixels across are drawn straight onto
+# the screen rather than kept as sprites, which would take a lot of memory.
+SPRITE_LIMIT = 256
+
+class Renderer():
+    """
+    Draws the game onto a pygame window, or onto an off screen surface when
+    headless, which is how the benchmarks time drawing.
+    """
+
+    def __init__(self, screen_width, screen_height, headless = False):
+        import pygame
+
+        self.pygame = pygame
+        self.screen_width = screen_width
+        self.screen_height = screen_height
+
+        if headless:
+            pygame.font.init()
+            self.screen = pygame.Surface((screen_width, screen_height))
+        else:
+            pygame.init()
+            self.screen = pygame.display.set_mode((screen_width,
+                                                   screen_height))
+
+        self.myfont = pygame.font.SysFont("monospace", 15)
+
+        self.offset = Vector(0, 0)
+        self.magnification = 1
+
+        # Pre-rendered vertex circles, keyed by colour, radius and
+        # magnification, and pre-rendered text, keyed by text and colour.
+        self.sprite_cache = {}
+        self.text_cache = {}
+
+    def zoom(self, factor):
+        self.magnification *= factor
+        self.sprite_cache.clear()
+
+    def fit(self, layout):
+        """
+        Zooms out, if need be, and centres the view so that every vertex of
+        the layout is on the screen.
+        """
+
+        bounds = layout.bounds()
+
+        if bounds is None:
+            return
+
+        left, top, right, bottom = bounds
+
+        # A little room is left around the board.
+        magnification = min(1, 0.95*self.screen_width/(right - left),
+                            0.95*self.screen_height/(bottom - top))
+
+        if magnification != self.magnification:
+            self.magnification = magnification
+            self.sprite_cache.clear()
+
+        self.offset = Vector(self.screen_width/2, self.screen_height/2) - \
+            Vector((left + right)/2, (top + bottom)/2)*magnification
+
+    def to_map(self, position):
+        """ Converts a position on the screen to a position on the map. """
+
+        return (Vector(*position) - self.offset)/self.magnification
+
+    def vertex_sprite(self, color, size):
+        """
+        Returns a surface with a circle of the given colour drawn on it, for
+        a vertex of the given radius on the map, along with the radius drawn
+        on the screen. Map radii are rounded to a multiple of SPRITE_BUCKET
+        pixels, so only a few sprites are drawn for each zoom level, and each
+        one only once. Returns None for the surface if the circle would be
+        more than SPRITE_LIMIT pixels across, which is then left to
+        draw_vertex.
+        """
+
+        pygame = self.pygame
+
+        bucket = max(1, int(size + SPRITE_BUCKET/2)//SPRITE_BUCKET)
+        radius = max(1, int(bucket*SPRITE_BUCKET*self.magnification))
+
+        if 2*radius > SPRITE_LIMIT:
+            return None, radius
+
+        key = (color, bucket, self.magnification)
+
+        if key not in self.sprite_cache:
+            sprite = pygame.Surface((2*radius, 2*radius), pygame.SRCALPHA)
+            pygame.draw.circle(sprite, rgb(color), (radius, radius), radius)
+            self.sprite_cache[key] = sprite
+
+        return self.sprite_cache[key], radius
+
+    def draw_vertex(self, color, size, x, y):
+        """
+        Draws a circle of the given colour, for a vertex of the given radius
+        on the map, centred on (x, y) on the screen.
+        """
+
+        sprite, radius = self.vertex_sprite(color, size)
+
+        if sprite is None:
+            self.pygame.draw.circle(self.screen, rgb(color), (x, y), radius)
+        else:
+            self.screen.blit(sprite, (x - radius, y - radius))
+
+    def text_surface(self, text, colour = (255, 255, 0)):
+        """
+        Returns a surface with the given text rendered on it, only rendering
+        the text again when it changes.
+        """
+
+        key = (text, colour)
+
+        if key not in self.text_cache:
+            # Old text, like past scores, is never shown again.
+            if len(self.text_cache) > 32:
+                self.text_cache.clear()
+
+            self.text_cache[key] = self.myfont.render(text, 1, colour)
+
+        return self.text_cache[key]
+
+    def draw_graph(self, graph, layout):
+        """ Using pygame, draws the map on the screen """
+
+        pygame = self.pygame
+        screen = self.screen
+        magnification = self.magnification
+        offset_x, offset_y = self.offset
+        state = layout.state
+        xs, ys, number = state.x, state.y, state.number
+
+        thickness = int(50*magnification)
+        white = COLOURS["WHITE"]
+
+        for edge_1, edge_2 in graph.graph.edges():
+            i, j = number[edge_1], number[edge_2]
+
+            coord_1 = (int(xs[i]*magnification + offset_x),
+                       int(ys[i]*magnification + offset_y))
+            coord_2 = (int(xs[j]*magnification + offset_x),
+                       int(ys[j]*magnification + offset_y))
+
+            pygame.draw.line(screen, white, coord_1, coord_2, thickness)
+
+        # Every vertex on screen is blitted from the sprite cache in one call,
+        # and vertices off the screen are skipped before a sprite is needed.
+        blits = []
+        palette = state.palette
+        screen_width = self.screen_width
+        screen_height = self.screen_height
+
+        for x, y, size, color in zip(xs, ys, state.radius, state.color):
+            x = int(x*magnification + offset_x)
+            y = int(y*magnification + offset_y)
+            reach = (size + SPRITE_BUCKET)*magnification
+
+            if x - reach >= screen_width or y - reach >= screen_height or \
+                    x + reach <= 0 or y + reach <= 0:
+                continue
+
+            sprite, radius = self.vertex_sprite(palette[color], size)
+
+            if sprite is None:
+                pygame.draw.circle(screen, rgb(palette[color]), (x, y), radius)
+            else:
+                blits.append((sprite, (x - radius, y - radius)))
+
+        screen.blits(blits, False)
+
+    def update_screen_image(self, graph, layout):
+        self.screen.fill(COLOURS["BLACK"])
+        self.draw_graph(graph, layout)
+
+    def print_selected_vertex(self, graph, layout, x):
+        center = layout.state.position(x)*self.magnification + self.offset
+        size = layout.state.get_radius(x)
+
+        for color, size in (("WHITE", size + 20),
+                            (layout.state.get_color(x), size)):
+            self.draw_vertex(color, size, int(center[0]), int(center[1]))
+
+    def print_score(self, score):
+        label = self.text_surface("Score: {}".format(score))
+        self.screen.blit(label, (0, 0))
+
+    def flip(self):
+        self.pygame.display.flip()
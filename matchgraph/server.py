@@ -0,0 +1,388 @@
+"""
+server.py
+
+Hosts many games of the matching game at once. Clients connect over a local
+socket and send one JSON object per line, getting one JSON object back per
+line. Every request has an "op" field, and may have an "id" field which is
+copied into the reply:
+
+    {"op": "new", "topology": "grid", "vertices": 100, "colors": 4, "seed": 1}
+    {"op": "board", "session": 1}
+    {"op": "swap", "session": 1, "vertices": [3, 4]}
+    {"op": "moves", "session": 1}
+    {"op": "close", "session": 1}
+
+Swaps reply with the score they scored, the new total and the vertices
+deleted. Failed requests reply with an "error" field. A request line longer
+than the server's limit is answered with an error, and the connection is
+closed, as the rest of the line cannot be told apart from the next request. Making boards,
+resolving the cascades of a swap and counting the moves left is done in a
+pool of workers, so that a large board does not hold up every other game.
+Threads are used by default; --processes uses a pool of processes instead,
+which keeps long cascades from holding up the server through the GIL.
+
+Usage:
+    python -m matchgraph.server --port 8765
+    python -m matchgraph.server --unix /tmp/matchgraph.sock --processes 4
+"""
+
+import argparse
+import asyncio
+import json
+
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import count
+from .boards import playable_board
+from .moves import MoveTracker
+
+# The longest line the server or client reads. A whole board is sent as one
+# line, which for a board of 60000 vertices is a few megabytes.
+LINE_LIMIT = 64*2**20
+
+def new_board(topology, vertex_count, color_count, seed):
+    """
+    Makes a playable board and finds every move on it, in a worker, returning
+    the board and its MoveTracker.
+    """
+
+    colorgraph = playable_board(topology, vertex_count, color_count,
+                                seed = seed)
+    tracker = MoveTracker(colorgraph)
+    tracker.update()
+
+    return colorgraph, tracker
+
+def update_moves(colorgraph, tracker):
+    """
+    Brings a board's moves up to date, in a worker. The board and tracker are
+    returned, as a process pool works on copies.
+    """
+
+    tracker.update()
+    return colorgraph, tracker
+
+def resolve_swap(colorgraph, tracker, vertex_1, vertex_2):
+    """
+    Plays a swap and all the cascades it causes, then brings the board's
+    moves up to date, in a worker. The board and tracker are returned along
+    with the result, as a process pool works on copies.
+    """
+
+    added_score, deleted = colorgraph.swap_vertices(vertex_1, vertex_2)
+    tracker.update()
+
+    return colorgraph, tracker, added_score, deleted
+
+class Session():
+    """ A single game being played on the server. """
+
+    def __init__(self, colorgraph, tracker):
+        self.colorgraph = colorgraph
+        self.tracker = tracker
+
+        # Moves on one board are made one at a time.
+        self.lock = asyncio.Lock()
+
+    def replace_board(self, colorgraph, tracker):
+        """
+        Takes the board back from a worker. Threads hand back the same board,
+        while processes hand back copies of the board and its tracker.
+        """
+
+        self.colorgraph = colorgraph
+        self.tracker = tracker
+
+class GameServer():
+    """
+    Holds every game session in memory, and answers requests on a socket.
+
+    >>> async def demo():
+    ...     server = GameServer()
+    ...     await server.start_tcp("127.0.0.1", 0)
+    ...     client = await GameClient.connect_tcp(*server.address)
+    ...     game = await client.request(op = "new", topology = "grid",
+    ...                                 vertices = 25, colors = 3, seed = 1)
+    ...     session = game["session"]
+    ...     moves = await client.request(op = "moves", session = session)
+    ...     move = moves["hint"]
+    ...     swap = await client.request(op = "swap", session = session,
+    ...                                 vertices = move)
+    ...     bad = await client.request(op = "swap", session = 99,
+    ...                                vertices = move)
+    ...     await client.close()
+    ...     await server.close()
+    ...     return swap["score"] >= 3, len(swap["deleted"]) >= 3, bad
+    >>> asyncio.run(demo())
+    (True, True, {'error': 'Unknown session 99'})
+
+    Requests longer than the limit are refused.
+
+    >>> async def demo():
+    ...     server = GameServer(limit = 100)
+    ...     await server.start_tcp("127.0.0.1", 0)
+    ...     client = await GameClient.connect_tcp(*server.address)
+    ...     reply = await client.request(op = "close", session = "x"*200)
+    ...     await client.close()
+    ...     await server.close()
+    ...     return reply
+    >>> asyncio.run(demo())
+    {'error': 'Request is longer than 100 bytes'}
+    """
+
+    def __init__(self, executor = None, limit = LINE_LIMIT):
+        """
+        Creates a server with no games. Boards are worked on in the given
+        concurrent.futures executor, or in a pool of threads if none is given.
+        A ProcessPoolExecutor keeps the work off the server's core entirely,
+        at the cost of copying the board to and from the worker on each move.
+        Request lines longer than limit bytes are refused.
+        """
+
+        self.executor = executor or ThreadPoolExecutor()
+        self.limit = limit
+        self.sessions = {}
+        self.session_ids = count(1)
+        self.server = None
+
+        # The writer of every connected client, by the task serving it.
+        self.clients = {}
+
+        self.handlers = {
+            "new": self.handle_new,
+            "board": self.handle_board,
+            "swap": self.handle_swap,
+            "moves": self.handle_moves,
+            "close": self.handle_close,
+        }
+
+    async def start_tcp(self, host = "127.0.0.1", port = 0):
+        """ Starts listening on a TCP port, 0 picking any free port. """
+
+        self.server = await asyncio.start_server(self.handle_client,
+                                                 host, port, limit = self.limit)
+
+    async def start_unix(self, path):
+        """ Starts listening on a Unix domain socket. """
+
+        self.server = await asyncio.start_unix_server(self.handle_client,
+                                                      path, limit = self.limit)
+
+    @property
+    def address(self):
+        """ The address the server is listening on. """
+
+        return self.server.sockets[0].getsockname()
+
+    async def close(self):
+        """ Stops listening and shuts down the workers. """
+
+        self.server.close()
+
+        for writer in self.clients.values():
+            writer.close()
+
+        await asyncio.gather(*self.clients, return_exceptions = True)
+        await self.server.wait_closed()
+        self.executor.shutdown()
+
+    async def handle_client(self, reader, writer):
+        """ Answers requests from one client until it disconnects. """
+
+        task = asyncio.current_task()
+        self.clients[task] = writer
+
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    reply = {"error": "Request is longer than {} bytes"
+                                      .format(self.limit)}
+                    writer.write(json.dumps(reply).encode() + b"\n")
+                    await writer.drain()
+                    break
+
+                if not line:
+                    break
+
+                reply = await self.answer(line)
+                writer.write(json.dumps(reply).encode() + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            del self.clients[task]
+            writer.close()
+
+    async def answer(self, line):
+        """ Works out the reply to one line sent by a client. """
+
+        try:
+            request = json.loads(line)
+        except ValueError:
+            return {"error": "Request is not valid JSON"}
+
+        if not isinstance(request, dict):
+            return {"error": "Request is not a JSON object"}
+
+        handler = self.handlers.get(request.get("op"))
+
+        if handler is None:
+            reply = {"error": "Unknown op {}".format(request.get("op"))}
+        else:
+            try:
+                reply = await handler(request)
+            except KeyError as error:
+                reply = {"error": "Missing {}".format(error.args[0])}
+            except (TypeError, ValueError) as error:
+                reply = {"error": str(error)}
+
+        if "id" in request:
+            reply["id"] = request["id"]
+
+        return reply
+
+    def get_session(self, request):
+        session_id = request.get("session")
+
+        if session_id not in self.sessions:
+            raise ValueError("Unknown session {}".format(session_id))
+
+        return self.sessions[session_id]
+
+    def run_in_worker(self, function, *args):
+        loop = asyncio.get_running_loop()
+        return loop.run_in_executor(self.executor, function, *args)
+
+    async def handle_new(self, request):
+        colorgraph, tracker = await self.run_in_worker(new_board,
+            request.get("topology", "random"), int(request["vertices"]),
+            int(request.get("colors", 4)), request.get("seed"))
+
+        session_id = next(self.session_ids)
+        self.sessions[session_id] = Session(colorgraph, tracker)
+
+        return {"session": session_id,
+                "vertices": len(colorgraph.vertex_colors)}
+
+    async def handle_board(self, request):
+        session = self.get_session(request)
+
+        async with session.lock:
+            colorgraph = session.colorgraph
+
+            return {"colors": [[vertex, color] for vertex, color
+                               in colorgraph.vertex_colors.items()],
+                    "edges": [list(edge) for edge in colorgraph.graph.edges()],
+                    "score": colorgraph.get_score()}
+
+    async def handle_swap(self, request):
+        session = self.get_session(request)
+        vertex_1, vertex_2 = request["vertices"]
+
+        async with session.lock:
+            colorgraph, tracker, added_score, deleted = \
+                await self.run_in_worker(resolve_swap, session.colorgraph,
+                                         session.tracker, vertex_1, vertex_2)
+            session.replace_board(colorgraph, tracker)
+
+            return {"score": added_score, "total": colorgraph.get_score(),
+                    "deleted": deleted}
+
+    async def handle_moves(self, request):
+        session = self.get_session(request)
+
+        async with session.lock:
+            # Every change is made in a worker, which leaves the moves up to
+            # date, so this is only a precaution against a stall on the loop.
+            if session.tracker.changed:
+                session.replace_board(*await self.run_in_worker(
+                    update_moves, session.colorgraph, session.tracker))
+
+            move = session.tracker.get_move()
+
+            return {"moves": session.tracker.available_moves(),
+                    "hint": list(move) if move else None}
+
+    async def handle_close(self, request):
+        session = self.get_session(request)
+
+        async with session.lock:
+            del self.sessions[request["session"]]
+
+        return {"closed": request["session"]}
+
+class GameClient():
+    """
+    Talks to a GameServer, sending one request at a time. Used for testing
+    the server, and as an example of the protocol.
+
+    >>> async def demo():
+    ...     server = GameServer()
+    ...     await server.start_tcp("127.0.0.1", 0)
+    ...     client = await GameClient.connect_tcp(*server.address)
+    ...     game = await client.request(op = "new", topology = "grid",
+    ...                                 vertices = 3000, colors = 4, seed = 1)
+    ...     board = await client.request(op = "board",
+    ...                                  session = game["session"])
+    ...     await client.close()
+    ...     await server.close()
+    ...     return len(board["colors"]), len(board["edges"]) > 10000
+    >>> asyncio.run(demo())
+    (3000, True)
+    """
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    @classmethod
+    async def connect_tcp(cls, host, port, limit = LINE_LIMIT):
+        return cls(*await asyncio.open_connection(host, port, limit = limit))
+
+    @classmethod
+    async def connect_unix(cls, path, limit = LINE_LIMIT):
+        return cls(*await asyncio.open_unix_connection(path, limit = limit))
+
+    async def request(self, **fields):
+        """ Sends a request made of the given fields, returning the reply. """
+
+        self.writer.write(json.dumps(fields).encode() + b"\n")
+        await self.writer.drain()
+
+        return json.loads(await self.reader.readline())
+
+    async def close(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+
+async def serve(args):
+    if args.processes is None:
+        server = GameServer()
+    else:
+        server = GameServer(ProcessPoolExecutor(args.processes or None))
+
+    if args.unix:
+        await server.start_unix(args.unix)
+    else:
+        await server.start_tcp(args.host, args.port)
+
+    print("Serving on {}".format(server.address))
+
+    async with server.server:
+        await server.server.serve_forever()
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description = "Matching game server")
+    parser.add_argument("--host", default = "127.0.0.1")
+    parser.add_argument("--port", type = int, default = 8765)
+    parser.add_argument("--unix", help = "listen on a Unix socket instead")
+    parser.add_argument("--processes", type = int, nargs = "?", const = 0,
+                        help = "work on boards in a pool of this many "
+                               "processes, or one per CPU if no number is "
+                               "given, instead of in threads")
+
+    asyncio.run(serve(parser.parse_args(argv)))
+
+if __name__ == "__main__":
+    main()